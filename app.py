@@ -1,9 +1,16 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import HTTPException
+from werkzeug.security import safe_join
 import os
 import sys
-import json
+import orjson
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import uuid
 
@@ -12,20 +19,59 @@ backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
-import pdf_parser
 from routes.constraint_routes import constraint_bp
 from routes.generation_routes import generation_bp
 from routes.validation_routes import validation_bp
 from routes.edit_routes import edit_bp
 from routes.analytics_routes import analytics_bp
 from routes.history_routes import history_bp
+from stores import BranchStore, SmartInputStore, count_divisions
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for jsonify() and request.get_json()"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def ojson(obj, status=200):
+    """JSON response serialized straight to bytes by orjson, for the large payload routes"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), status=status, mimetype='application/json')
+
+def ojson_cached(etag, build):
+    """
+    ojson() response tagged with a weak ETag; answers 304 without calling
+    `build` when the client's If-None-Match already has that ETag.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = ojson(build())
+    response.set_etag(etag, weak=True)
+    return response
 
 app = Flask(__name__, static_folder='static', static_url_path='')
+app.json = ORJSONProvider(app)
+# Reject oversized request bodies before they are read and parsed
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))
 # Allow CORS for all domains for development simplicity
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 print("Server running on http://localhost:5000")
 
+@app.errorhandler(Exception)
+def handle_exception(e):
+    """Turn errors raised by any route into JSON responses"""
+    if isinstance(e, HTTPException):
+        # 404/405/413 etc. keep their status; API clients still get JSON
+        if request.path.startswith('/api/'):
+            return jsonify({'error': e.description}), e.code
+        return e
+    app.logger.exception(e)
+    return jsonify({'error': str(e)}), 500
+
 # Register blueprints
 app.register_blueprint(constraint_bp)
 app.register_blueprint(generation_bp)
@@ -36,8 +82,11 @@ app.register_blueprint(history_bp)
 
 # Data directory setup
 DATA_DIR = 'data'
-BRANCHES_FILE = os.path.join(DATA_DIR, 'branches.json')
+DB_FILE = os.path.join(DATA_DIR, 'timetable.db')
+BRANCHES_FILE = os.path.join(DATA_DIR, 'branches.json')  # legacy JSON store, imported into DB_FILE
 UPLOAD_DIR = os.path.join(DATA_DIR, 'uploads')
+# Uploaded PDFs are parsed in memory; set PDF_UPLOAD_AUDIT=1 to also keep a copy in UPLOAD_DIR
+PDF_UPLOAD_AUDIT = os.environ.get('PDF_UPLOAD_AUDIT') == '1'
 VERSIONS_DIR = os.path.join(DATA_DIR, 'versions')
 
 # Ensure data directories exist
@@ -50,28 +99,36 @@ if not os.path.exists(VERSIONS_DIR):
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'pdf'}
+_ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-# Initialize branches file if it doesn't exist
-if not os.path.exists(BRANCHES_FILE):
-    with open(BRANCHES_FILE, 'w') as f:
-        json.dump({'branches': []}, f)
-
-# Helper functions
-def load_branches():
-    """Load branches from JSON file"""
-    try:
-        with open(BRANCHES_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {'branches': []}
-
-def save_branches(data):
-    """Save branches to JSON file"""
-    with open(BRANCHES_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+# (epoch second, formatted timestamp) of the last now_iso() call
+_now_iso_cache = (None, None)
+
+def now_iso():
+    """Current local time as an ISO-8601 string, formatted at most once per second"""
+    global _now_iso_cache
+    second = int(time.time())
+    cached_second, cached_value = _now_iso_cache
+    if cached_second != second:
+        cached_value = datetime.fromtimestamp(second).isoformat()
+        _now_iso_cache = (second, cached_value)
+    return cached_value
+
+def new_id():
+    """Random record id (uuid4 hex)"""
+    return uuid.uuid4().hex
+
+def missing_fields_response(missing):
+    """400 response listing every missing required field at once"""
+    fields = sorted(missing)
+    label = 'field' if len(fields) == 1 else 'fields'
+    return jsonify({'error': f"Missing required {label}: {', '.join(fields)}", 'fields': fields}), 400
+
+# Branch configurations (see backend/stores)
+branch_store = BranchStore(DB_FILE, legacy_file=BRANCHES_FILE)
 
 # API Routes (placeholders for authentication)
 @app.route('/api/auth/login', methods=['POST'])
@@ -92,226 +149,179 @@ def health():
     return jsonify({'status': 'ok', 'message': 'Flask server is running'}), 200
 
 # Branch Setup API Endpoints
+_REQUIRED_BRANCH_FIELDS = frozenset({'branchName', 'academicYears', 'divisions', 'workingDays'})
+
 @app.route('/api/branch/setup', methods=['POST'])
 def create_branch():
     """Create a new branch configuration"""
-    try:
-        data = request.get_json()
-        print(f"📥 [Branch Setup] Received payload: {json.dumps(data, indent=2)}")
-        
-        # Validate required fields
-        required_fields = ['branchName', 'academicYears', 'divisions', 'workingDays']
-        for field in required_fields:
-            if field not in data:
-                print(f"❌ [Branch Setup] Missing field: {field}")
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Load existing branches
-        branches_data = load_branches()
-        
-        # Check for duplicate branch name - REMOVED per requirements
-        # for branch in branches_data['branches']:
-        #     if branch['branchName'].lower() == data['branchName'].lower():
-        #         return jsonify({'error': 'Branch name already exists'}), 409
-        
-        # Create new branch with ID and timestamp
-        new_branch = {
-            'id': str(uuid.uuid4()),
-            'createdAt': datetime.now().isoformat(),
-            **data
-        }
-        
-        # Add to branches list
-        branches_data['branches'].append(new_branch)
-        
-        # Save to file
-        save_branches(branches_data)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Branch created successfully',
-            'branch': new_branch
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    print(f"📥 [Branch Setup] Received payload: {orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}")
+    
+    # Validate required fields
+    missing = _REQUIRED_BRANCH_FIELDS.difference(data)
+    if missing:
+        print(f"❌ [Branch Setup] Missing fields: {sorted(missing)}")
+        return missing_fields_response(missing)
+    
+    if not isinstance(data['branchName'], str):
+        return jsonify({'error': 'branchName must be a string'}), 400
+    divisions = data['divisions']
+    if not isinstance(divisions, dict) or not all(isinstance(divs, list) for divs in divisions.values()):
+        return jsonify({'error': 'divisions must map each academic year to a list of divisions'}), 400
+    
+    # Check for duplicate branch name - REMOVED per requirements
+    # if branch_store.name_exists(data['branchName']):
+    #     return jsonify({'error': 'Branch name already exists'}), 409
+    
+    # Create new branch with ID and timestamp; the ID is always server
+    # generated, since a client-supplied one could collide with another branch
+    new_branch = {
+        'createdAt': now_iso(),
+        **data,
+        'id': new_id(),
+        'totalDivisions': count_divisions(data['divisions'])
+    }
+    
+    # Store the branch
+    branch_store.add(new_branch)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Branch created successfully',
+        'branch': new_branch
+    }), 201
 
 @app.route('/api/branch/all', methods=['GET'])
 def get_all_branches():
     """Get all branch configurations"""
-    try:
-        branches_data = load_branches()
-        
-        # Return simplified branch info
-        simplified_branches = []
-        for branch in branches_data['branches']:
-            simplified_branches.append({
-                'id': branch['id'],
-                'branchName': branch['branchName'],
-                'academicYears': branch['academicYears'],
-                'totalDivisions': sum(len(divs) for divs in branch['divisions'].values()),
-                'createdAt': branch['createdAt']
-            })
-        
-        return jsonify({'branches': simplified_branches}), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Simplified branch info is rebuilt only when the branches table changes
+    return ojson_cached(branch_store.etag(), lambda: {'branches': branch_store.list_simplified()})
 
 @app.route('/api/branch/<branch_id>', methods=['GET'])
 def get_branch(branch_id):
     """Get a specific branch by ID"""
-    try:
-        branches_data = load_branches()
-        
-        # Find branch by ID
-        for branch in branches_data['branches']:
-            if branch['id'] == branch_id:
-                return jsonify({'branch': branch}), 200
-        
-        return jsonify({'error': 'Branch not found'}), 404
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Read the ETag first so a concurrent write can only make it stale, never too new
+    etag = branch_store.etag()
+    branch = branch_store.find(branch_id)
+    if branch:
+        return ojson_cached(etag, lambda: {'branch': branch})
+    
+    return jsonify({'error': 'Branch not found'}), 404
 
 @app.route('/api/branch/validate-name', methods=['POST'])
 def validate_branch_name():
     """Check if a branch name is available"""
-    try:
-        data = request.get_json()
-        branch_name = data.get('name', '')
-        
-        if not branch_name:
-            return jsonify({'error': 'Branch name is required'}), 400
-        
-        branches_data = load_branches()
-        
-        # Check if name exists
-        for branch in branches_data['branches']:
-            if branch['branchName'].lower() == branch_name.lower():
-                return jsonify({'available': False}), 200
-        
-        return jsonify({'available': True}), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    branch_name = data.get('name', '')
+    
+    if not branch_name:
+        return jsonify({'error': 'Branch name is required'}), 400
+    
+    # Check if name exists
+    if branch_store.name_exists(branch_name):
+        return jsonify({'available': False}), 200
+    
+    return jsonify({'available': True}), 200
 
 # Smart Input API Endpoints
+# Legacy file-based history locations, imported into DB_FILE on first start
 SMART_INPUT_FILE = os.path.join(DATA_DIR, 'smart_input_history.json')
-
-# Initialize smart input history file
-if not os.path.exists(SMART_INPUT_FILE):
-    with open(SMART_INPUT_FILE, 'w') as f:
-        json.dump({'history': []}, f)
-
-def load_smart_input_history():
-    """Load smart input history from JSON file"""
-    try:
-        with open(SMART_INPUT_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {'history': []}
-
-def save_smart_input_history(data):
-    """Save smart input history to JSON file"""
-    with open(SMART_INPUT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+SMART_INPUT_DIR = os.path.join(DATA_DIR, 'smart_inputs')
+SMART_INPUT_HISTORY_LIMIT = 20
+# Above this many unmapped subjects, validation returns a summary instead of one error each
+UNMAPPED_SUBJECT_DETAIL_LIMIT = 10
+_REQUIRED_SMART_INPUT_FIELDS = frozenset({'teachers', 'subjects'})
+
+smart_input_store = SmartInputStore(
+    DB_FILE, legacy_dir=SMART_INPUT_DIR, legacy_file=SMART_INPUT_FILE, limit=SMART_INPUT_HISTORY_LIMIT
+)
 
 @app.route('/api/smart-input/save', methods=['POST'])
 def save_smart_input():
     """Save smart input data"""
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if 'teachers' not in data or 'subjects' not in data:
-            return jsonify({'error': 'Missing required fields: teachers or subjects'}), 400
-        
-        # Load history
-        history_data = load_smart_input_history()
-        
-        # Create new entry
-        new_entry = {
-            'id': str(uuid.uuid4()),
-            'branchName': data.get('branchName', 'Unknown Branch'),
-            'createdAt': datetime.now().isoformat(),
-            'teacherCount': len(data.get('teachers', [])),
-            'subjectCount': len(data.get('subjects', [])),
-            'data': data
-        }
-        
-        # Add to history
-        history_data['history'].append(new_entry)
-        
-        # Keep only last 20 entries
-        if len(history_data['history']) > 20:
-            history_data['history'] = history_data['history'][-20:]
-        
-        # Save
-        save_smart_input_history(history_data)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Smart input data saved successfully',
-            'id': new_entry['id']
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    # Validate required fields
+    missing = _REQUIRED_SMART_INPUT_FIELDS.difference(data)
+    if missing:
+        return missing_fields_response(missing)
+    
+    # Create new entry (metadata only; the payload is stored in its own column)
+    new_entry = {
+        'id': new_id(),
+        'branchName': data.get('branchName', 'Unknown Branch'),
+        'createdAt': now_iso(),
+        'teacherCount': len(data.get('teachers', [])),
+        'subjectCount': len(data.get('subjects', [])),
+    }
+    # The request body is exactly the payload we store, so persist the raw
+    # bytes instead of re-serializing the parsed object
+    smart_input_store.add(new_entry, request.get_data())
+    
+    return jsonify({
+        'success': True,
+        'message': 'Smart input data saved successfully',
+        'id': new_entry['id']
+    }), 201
 
 @app.route('/api/smart-input/history', methods=['GET'])
 def get_smart_input_history():
-    """Get smart input history"""
-    try:
-        history_data = load_smart_input_history()
-        return jsonify(history_data), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    """Get smart input history (metadata only; see get_smart_input_entry for payloads)"""
+    return ojson_cached(smart_input_store.etag(), lambda: {'history': smart_input_store.history()})
+
+@app.route('/api/smart-input/<entry_id>', methods=['GET'])
+def get_smart_input_entry(entry_id):
+    """Get a smart input history entry including its full data"""
+    entry = smart_input_store.load_entry(entry_id)
+    if entry is None:
+        return jsonify({'error': 'Smart input entry not found'}), 404
+    
+    return ojson({'entry': entry})
 
 @app.route('/api/smart-input/validate', methods=['POST'])
 def validate_smart_input():
     """Validate smart input data"""
-    try:
-        data = request.get_json()
-        
-        errors = []
-        warnings = []
-        
-        # Basic validation
-        if not data.get('teachers') or len(data.get('teachers', [])) == 0:
-            errors.append({'message': 'At least one teacher is required'})
-        
-        if not data.get('subjects') or len(data.get('subjects', [])) == 0:
-            errors.append({'message': 'At least one subject is required'})
-        
-        # Check for unmapped subjects
-        teacher_subject_map = data.get('teacherSubjectMap', [])
-        subjects = data.get('subjects', [])
-        
-        mapped_subject_ids = set(m['subjectId'] for m in teacher_subject_map)
-        for subject in subjects:
-            if subject['id'] not in mapped_subject_ids:
-                errors.append({
-                    'message': f'Subject "{subject["name"]}" has no teacher assigned'
-                })
-        
-        return jsonify({
-            'valid': len(errors) == 0,
-            'errors': errors,
-            'warnings': warnings
-        }), 200
+    data = request.get_json()
+    
+    errors = []
+    warnings = []
+    
+    # Basic validation
+    if not data.get('teachers') or len(data.get('teachers', [])) == 0:
+        errors.append({'message': 'At least one teacher is required'})
+    
+    if not data.get('subjects') or len(data.get('subjects', [])) == 0:
+        errors.append({'message': 'At least one subject is required'})
+    
+    # Check for unmapped subjects
+    teacher_subject_map = data.get('teacherSubjectMap', [])
+    subjects = data.get('subjects', [])
+    
+    if subjects:
+        mapped_subject_ids = frozenset(m['subjectId'] for m in teacher_subject_map)
+        missing = [(s['id'], s['name']) for s in subjects if s['id'] not in mapped_subject_ids]
         
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        if len(missing) <= UNMAPPED_SUBJECT_DETAIL_LIMIT:
+            for _, name in missing:
+                errors.append({'message': f'Subject "{name}" has no teacher assigned'})
+        else:
+            # Summarise instead of emitting one message per subject
+            errors.append({
+                'message': f'{len(missing)} subjects have no teacher assigned',
+                'count': len(missing),
+                'sampleUnmapped': [
+                    {'id': subject_id, 'name': name}
+                    for subject_id, name in missing[:UNMAPPED_SUBJECT_DETAIL_LIMIT]
+                ]
+            })
+    
+    return jsonify({
+        'valid': len(errors) == 0,
+        'errors': errors,
+        'warnings': warnings
+    }), 200
 
 # What-If Simulation API Endpoints
-from simulation.scenarios import (
-    simulate_teacher_unavailable,
-    simulate_lab_unavailable,
-    simulate_days_reduced
-)
-from simulation.simulation_report import generate_simulation_report
 from history.history_service import HistoryService
 
 # Initialize history service for simulation
@@ -320,35 +330,33 @@ history_service_sim = HistoryService()
 @app.route('/api/simulation/scenarios', methods=['GET'])
 def get_available_scenarios():
     """Get list of supported simulation scenarios"""
-    try:
-        scenarios = [
-            {
-                "type": "TEACHER_UNAVAILABLE",
-                "name": "Teacher Unavailable",
-                "description": "Simulate what happens when a teacher is unavailable for specific days or the entire week",
-                "parameters": ["teacherName", "unavailableSpec"],
-                "icon": "👨‍🏫"
-            },
-            {
-                "type": "LAB_UNAVAILABLE",
-                "name": "Lab Removed / Unavailable",
-                "description": "Simulate lab removal or unavailability, reassigning practicals to remaining labs",
-                "parameters": ["labName"],
-                "icon": "🔬"
-            },
-            {
-                "type": "DAYS_REDUCED",
-                "name": "Working Days Reduced",
-                "description": "Simulate reducing working days (e.g., removing Saturday)",
-                "parameters": ["newWorkingDays", "newSlotsConfig"],
-                "icon": "📅"
-            }
-        ]
-        
-        return jsonify({"scenarios": scenarios}), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    scenarios = [
+        {
+            "type": "TEACHER_UNAVAILABLE",
+            "name": "Teacher Unavailable",
+            "description": "Simulate what happens when a teacher is unavailable for specific days or the entire week",
+            "parameters": ["teacherName", "unavailableSpec"],
+            "icon": "👨‍🏫"
+        },
+        {
+            "type": "LAB_UNAVAILABLE",
+            "name": "Lab Removed / Unavailable",
+            "description": "Simulate lab removal or unavailability, reassigning practicals to remaining labs",
+            "parameters": ["labName"],
+            "icon": "🔬"
+        },
+        {
+            "type": "DAYS_REDUCED",
+            "name": "Working Days Reduced",
+            "description": "Simulate reducing working days (e.g., removing Saturday)",
+            "parameters": ["newWorkingDays", "newSlotsConfig"],
+            "icon": "📅"
+        }
+    ]
+    
+    return jsonify({"scenarios": scenarios}), 200
+
+_REQUIRED_SIMULATION_FIELDS = ('scenarioType', 'currentTimetable')
 
 @app.route('/api/simulation/run', methods=['POST'])
 def run_simulation():
@@ -363,110 +371,106 @@ def run_simulation():
         "parameters": { scenario-specific parameters }
     }
     """
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        scenario_type = data.get('scenarioType')
-        current_timetable = data.get('currentTimetable', [])
-        parameters = data.get('parameters', {})
-        
-        if not scenario_type:
-            return jsonify({'error': 'scenarioType is required'}), 400
-        
-        if not current_timetable:
-            return jsonify({'error': 'currentTimetable is required'}), 400
-        
-        # Load branch context
-        branch_id = data.get('branchId')
-        context = {}
-        
-        if branch_id:
-            branches_data = load_branches()
-            for branch in branches_data['branches']:
-                if branch['id'] == branch_id:
-                    context['branchData'] = branch
-                    break
-        
-        # Load smart input data if available
-        smart_input_id = data.get('smartInputId')
-        if smart_input_id:
-            history_data = load_smart_input_history()
-            for entry in history_data['history']:
-                if entry['id'] == smart_input_id:
-                    context['smartInputData'] = entry['data']
-                    break
-        
-        # If no context provided, try to extract from request
-        if not context.get('branchData'):
-            context['branchData'] = data.get('branchData', {})
-        if not context.get('smartInputData'):
-            context['smartInputData'] = data.get('smartInputData', {})
-        
-        # Run simulation based on scenario type
-        simulation_result = None
+    # Imported lazily so startup and non-simulation requests don't pay for them
+    from simulation.scenarios import (
+        simulate_teacher_unavailable,
+        simulate_lab_unavailable,
+        simulate_days_reduced
+    )
+    from simulation.simulation_report import generate_simulation_report
+    
+    data = request.get_json()
+    
+    # Validate required fields (present and non-empty)
+    missing = {field for field in _REQUIRED_SIMULATION_FIELDS if not data.get(field)}
+    if missing:
+        return missing_fields_response(missing)
+    
+    scenario_type = data['scenarioType']
+    current_timetable = data['currentTimetable']
+    parameters = data.get('parameters', {})
+    
+    # Load branch context
+    branch_id = data.get('branchId')
+    context = {}
+    
+    if branch_id:
+        branch = branch_store.find(branch_id)
+        if branch:
+            context['branchData'] = branch
+    
+    # Load smart input data if available
+    smart_input_id = data.get('smartInputId')
+    if smart_input_id:
+        smart_input_data = smart_input_store.load_data(smart_input_id)
+        if smart_input_data is not None:
+            context['smartInputData'] = smart_input_data
+    
+    # If no context provided, try to extract from request
+    if not context.get('branchData'):
+        context['branchData'] = data.get('branchData', {})
+    if not context.get('smartInputData'):
+        context['smartInputData'] = data.get('smartInputData', {})
+    
+    # Run simulation based on scenario type
+    simulation_result = None
+    
+    if scenario_type == 'TEACHER_UNAVAILABLE':
+        teacher_name = parameters.get('teacherName')
+        unavailable_spec = parameters.get('unavailableSpec', {})
         
-        if scenario_type == 'TEACHER_UNAVAILABLE':
-            teacher_name = parameters.get('teacherName')
-            unavailable_spec = parameters.get('unavailableSpec', {})
-            
-            if not teacher_name:
-                return jsonify({'error': 'teacherName is required for this scenario'}), 400
-            
-            simulation_result = simulate_teacher_unavailable(
-                current_timetable,
-                context,
-                teacher_name,
-                unavailable_spec
-            )
+        if not teacher_name:
+            return jsonify({'error': 'teacherName is required for this scenario'}), 400
         
-        elif scenario_type == 'LAB_UNAVAILABLE':
-            lab_name = parameters.get('labName')
-            
-            if not lab_name:
-                return jsonify({'error': 'labName is required for this scenario'}), 400
-            
-            simulation_result = simulate_lab_unavailable(
-                current_timetable,
-                context,
-                lab_name
-            )
-        
-        elif scenario_type == 'DAYS_REDUCED':
-            new_working_days = parameters.get('newWorkingDays')
-            new_slots_config = parameters.get('newSlotsConfig')
-            
-            if not new_working_days:
-                return jsonify({'error': 'newWorkingDays is required for this scenario'}), 400
-            
-            simulation_result = simulate_days_reduced(
-                current_timetable,
-                context,
-                new_working_days,
-                new_slots_config
-            )
+        simulation_result = simulate_teacher_unavailable(
+            current_timetable,
+            context,
+            teacher_name,
+            unavailable_spec
+        )
+    
+    elif scenario_type == 'LAB_UNAVAILABLE':
+        lab_name = parameters.get('labName')
         
-        else:
-            return jsonify({'error': f'Unknown scenario type: {scenario_type}'}), 400
+        if not lab_name:
+            return jsonify({'error': 'labName is required for this scenario'}), 400
         
-        # Generate detailed report
-        report = generate_simulation_report(
+        simulation_result = simulate_lab_unavailable(
             current_timetable,
-            simulation_result['simulatedTimetable'],
             context,
-            simulation_result
+            lab_name
         )
+    
+    elif scenario_type == 'DAYS_REDUCED':
+        new_working_days = parameters.get('newWorkingDays')
+        new_slots_config = parameters.get('newSlotsConfig')
         
-        return jsonify({
-            'success': True,
-            'simulation': simulation_result,
-            'report': report
-        }), 200
+        if not new_working_days:
+            return jsonify({'error': 'newWorkingDays is required for this scenario'}), 400
         
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        simulation_result = simulate_days_reduced(
+            current_timetable,
+            context,
+            new_working_days,
+            new_slots_config
+        )
+    
+    else:
+        return jsonify({'error': f'Unknown scenario type: {scenario_type}'}), 400
+    
+    # Generate detailed report
+    report = generate_simulation_report(
+        current_timetable,
+        simulation_result['simulatedTimetable'],
+        context,
+        simulation_result
+    )
+    
+    return ojson({
+        'success': True,
+        'simulation': simulation_result,
+        'report': report
+    })
 
 @app.route('/api/simulation/apply', methods=['POST'])
 def apply_simulation():
@@ -480,128 +484,198 @@ def apply_simulation():
         "simulatedTimetable": [...]
     }
     """
+    data = request.get_json()
+    
+    branch_id = data.get('branchId')
+    simulated_timetable = data.get('simulatedTimetable', [])
+    
+    if not branch_id:
+        return jsonify({'error': 'branchId is required'}), 400
+    
+    if not simulated_timetable:
+        return jsonify({'error': 'simulatedTimetable is required'}), 400
+    
+    # In a real implementation, you would save this to a database or file
+    # For now, we'll just return a success message
+    # You can extend this to integrate with your existing timetable storage
+    
+    # Create version in history
     try:
-        data = request.get_json()
-        
-        branch_id = data.get('branchId')
-        simulated_timetable = data.get('simulatedTimetable', [])
-        
-        if not branch_id:
-            return jsonify({'error': 'branchId is required'}), 400
-        
-        if not simulated_timetable:
-            return jsonify({'error': 'simulatedTimetable is required'}), 400
-        
-        # In a real implementation, you would save this to a database or file
-        # For now, we'll just return a success message
-        # You can extend this to integrate with your existing timetable storage
-        
-        # Create version in history
-        try:
-            # Get branch and smart input data from request
-            branch_data = data.get('branchData')
-            smart_input_data = data.get('smartInputData')
+        # Get branch and smart input data from request
+        branch_data = data.get('branchData')
+        smart_input_data = data.get('smartInputData')
+        
+        if branch_data and smart_input_data:
+            context = {
+                'branchData': branch_data,
+                'smartInputData': smart_input_data
+            }
             
-            if branch_data and smart_input_data:
-                context = {
-                    'branchData': branch_data,
-                    'smartInputData': smart_input_data
-                }
-                
-                version = history_service_sim.auto_create_version(
-                    timetable=simulated_timetable,
-                    context=context,
-                    action="Simulation Applied",
-                    description="What-If simulation applied to active timetable"
-                )
-                version_id = version['versionId']
-            else:
-                version_id = None
-        except Exception as e:
-            print(f"Failed to create version: {e}")
+            version = history_service_sim.auto_create_version(
+                timetable=simulated_timetable,
+                context=context,
+                action="Simulation Applied",
+                description="What-If simulation applied to active timetable"
+            )
+            version_id = version['versionId']
+        else:
             version_id = None
-        
-        return jsonify({
-            'success': True,
-            'message': 'Simulation applied successfully',
-            'timetableSlots': len(simulated_timetable),
-            'versionId': version_id
-        }), 200
-        
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        print(f"Failed to create version: {e}")
+        version_id = None
+    
+    return jsonify({
+        'success': True,
+        'message': 'Simulation applied successfully',
+        'timetableSlots': len(simulated_timetable),
+        'versionId': version_id
+    }), 200
 
 # Timetable Upload API Endpoints
+# PDF parsing (text extraction/OCR) is CPU-bound, so it runs in worker processes
+# and the request thread only waits on the result
+PDF_PARSE_WORKERS = int(os.environ.get('PDF_PARSE_WORKERS', os.cpu_count() or 1))
+PDF_PARSE_TIMEOUT = int(os.environ.get('PDF_PARSE_TIMEOUT', 60))
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def _get_pdf_pool():
+    """Get the PDF parsing process pool, creating it on first use"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                # Spawned, not forked: the server process is multi-threaded, and
+                # a fork would copy other threads' held locks into the workers
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _pdf_pool
+
+def _discard_pdf_pool(pool):
+    """
+    Kill a pool whose worker is stuck on a parse and drop it, so later uploads
+    get a fresh pool instead of queueing behind it. Parses still running in
+    the killed pool fail with BrokenProcessPool.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    # Cancelling a future does not stop a parse that has started, so
+    # terminate the worker processes themselves. The executor has no public
+    # way to reach them: _processes is a CPython implementation detail, so
+    # without it the workers are only shut down, not killed.
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
 @app.route('/api/upload/timetable/pdf', methods=['POST'])
 def upload_pdf_timetable():
-    """Handle PDF timetable uploads"""
-    try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        
-        # Check if file is selected
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Validate file type
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
-        
-        # Secure the filename
-        filename = secure_filename(file.filename)
-        
-        # Add timestamp to avoid conflicts
+    """
+    Handle PDF timetable uploads.
+    
+    A parse that exceeds PDF_PARSE_TIMEOUT gets a 504, and its worker is
+    killed by discarding the whole pool, since a single pool worker cannot
+    be stopped on its own. Other uploads parsing in the same pool at that
+    moment fail with 503 and have to be retried. This trade-off keeps the
+    warm shared pool instead of starting a process per upload.
+    """
+    # pdfplumber/pytesseract are only needed here; import on first upload
+    import pdf_parser
+    
+    # Check if file is present
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    file = request.files['file']
+    
+    # Check if file is selected
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    # Validate file type
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
+    
+    pdf_bytes = file.read()
+    
+    # Optionally keep a copy of the upload for auditing/debugging
+    if PDF_UPLOAD_AUDIT:
+        # Generated name only; no user-controlled bytes reach the path
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # Save the file
-        file.save(filepath)
-        
-        try:
-            # Parse the PDF
-            result = pdf_parser.parse_pdf_file(filepath)
-            
-            # Clean up the file after processing
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            
-            if result['success']:
-                return jsonify({
-                    'success': True,
-                    'type': result['type'],
-                    'pages': result['pages'],
-                    'extractionMethod': result['extraction_method'],
-                    'rowCount': result['row_count'],
-                    'data': result['rows']
-                }), 200
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': result['error']
-                }), 400
-        
-        except Exception as e:
-            # Clean up on error
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            raise e
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        unique_filename = f"{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+        with open(os.path.join(UPLOAD_DIR, unique_filename), 'wb') as f:
+            f.write(pdf_bytes)
+    
+    # Parse the PDF straight from memory in a worker process
+    pool = _get_pdf_pool()
+    try:
+        future = pool.submit(pdf_parser.parse_pdf_stream, pdf_bytes)
+    except RuntimeError:
+        # Another upload's timeout shut this pool down after we fetched it
+        pool = _get_pdf_pool()
+        future = pool.submit(pdf_parser.parse_pdf_stream, pdf_bytes)
+    try:
+        result = future.result(timeout=PDF_PARSE_TIMEOUT)
+    except FutureTimeoutError:
+        _discard_pdf_pool(pool)
+        return jsonify({'error': 'PDF parsing timed out'}), 504
+    except BrokenProcessPool:
+        # Another upload's timeout killed the pool this parse was running in
+        return jsonify({'error': 'PDF parsing was interrupted, please retry'}), 503
+    
+    if result['success']:
+        return jsonify({
+            'success': True,
+            'type': result['type'],
+            'pages': result['pages'],
+            'extractionMethod': result['extraction_method'],
+            'rowCount': result['row_count'],
+            'data': result['rows']
+        }), 200
+    else:
+        return jsonify({
+            'success': False,
+            'error': result['error']
+        }), 400
 
 # Serve React App
+def _collect_static_files(root):
+    """Relative (URL-style) paths of every file in the built frontend"""
+    files = set()
+    for dirpath, _, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        for filename in filenames:
+            rel_path = filename if rel_dir == '.' else os.path.join(rel_dir, filename)
+            files.add(rel_path.replace(os.sep, '/'))
+    return frozenset(files)
+
+# Looked up once at import so asset requests skip the filesystem; a miss
+# re-checks the disk, since the frontend may be rebuilt while we run
+_STATIC_FILES = _collect_static_files(app.static_folder)
+
+def _is_static_file(path):
+    """Whether `path` is a file in the frontend build, refreshing the cached set on new files"""
+    global _STATIC_FILES
+    if path in _STATIC_FILES:
+        return True
+    full_path = safe_join(app.static_folder, path)
+    if full_path is None or not os.path.isfile(full_path):
+        return False
+    _STATIC_FILES = _collect_static_files(app.static_folder)
+    return True
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
     """Serve React static files"""
-    if path != "" and os.path.exists(app.static_folder + '/' + path):
+    if path and _is_static_file(path):
         return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    return send_from_directory(app.static_folder, 'index.html')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Local development only; production runs through wsgi.py under gunicorn
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
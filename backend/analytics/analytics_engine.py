@@ -4,10 +4,30 @@ Analytics Engine
 Main orchestrator for all analytics modules and quality scoring.
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import chain, islice
+
+import orjson
+
 from .workload_analysis import compute_teacher_workload, generate_workload_insights
 from .lab_usage import compute_lab_heatmap, analyze_lab_efficiency
 from .free_slots import find_free_slots, analyze_free_capacity
 from .bottleneck_detector import detect_bottlenecks, prioritize_bottlenecks
+from .slot_index import build_slot_index
+
+
+# Leading emoji of the generated insight strings, matched on the first
+# character (the warning sign is followed by a variation selector)
+ISSUE_PREFIXES = frozenset(('⚠', '⚡', '🔴'))
+STRENGTH_PREFIXES = frozenset(('✅', '🟢', '📊'))
+
+# Recent full reports keyed by a digest of (timetable, context); the UI
+# re-requests the same report on refreshes and exports
+REPORT_CACHE_SIZE = 32
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
 
 
 def generate_full_analytics(timetable, context):
@@ -31,12 +51,49 @@ def generate_full_analytics(timetable, context):
                 "topStrengths": [str]
             }
         }
+    
+    Reports are memoized by content, so the returned dict may be shared
+    between callers and must be treated as read-only.
     """
+    key = _report_key(timetable, context)
+    if key is None:
+        return _build_full_analytics(timetable, context)
+    
+    with _report_cache_lock:
+        report = _report_cache.get(key)
+        if report is not None:
+            _report_cache.move_to_end(key)
+            return report
+    
+    report = _build_full_analytics(timetable, context)
+    
+    with _report_cache_lock:
+        _report_cache[key] = report
+        if len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    
+    return report
+
+
+def _report_key(timetable, context):
+    """Digest of the analytics inputs, or None if they are not JSON-serializable."""
+    try:
+        payload = orjson.dumps([timetable, context], option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _build_full_analytics(timetable, context):
+    """Compute the report returned by generate_full_analytics."""
+    # Scan the timetable once and share the aggregates between all metrics
+    index = build_slot_index(timetable)
+    
     # Compute all metrics
-    workload = compute_teacher_workload(timetable, context)
-    lab_usage = compute_lab_heatmap(timetable, context)
-    free_slots = find_free_slots(timetable, context)
-    bottlenecks = detect_bottlenecks(timetable, context)
+    workload = compute_teacher_workload(timetable, context, index)
+    lab_usage = compute_lab_heatmap(timetable, context, index)
+    free_slots = find_free_slots(timetable, context, index)
+    bottlenecks = detect_bottlenecks(timetable, context, index)
     
     # Generate insights
     workload_insights = generate_workload_insights(workload)
@@ -124,7 +181,11 @@ def compute_quality_score(analytics):
     per_teacher = workload.get('perTeacher', {})
     
     if per_teacher:
-        balanced_count = sum(1 for m in per_teacher.values() if m.get('classification') == 'balanced')
+        classification_counts = workload.get('classificationCounts')
+        if classification_counts is not None:
+            balanced_count = classification_counts.get('balanced', 0)
+        else:
+            balanced_count = sum(1 for m in per_teacher.values() if m.get('classification') == 'balanced')
         total_teachers = len(per_teacher)
         load_balance = (balanced_count / total_teachers * 100) if total_teachers > 0 else 50
     else:
@@ -207,14 +268,14 @@ def extract_top_insights(analytics_insights):
     quality_score = analytics_insights.get('quality_score', {})
     
     # Issues: prioritize critical bottlenecks
-    for bottleneck in bottlenecks[:3]:  # Top 3 bottlenecks
+    for bottleneck in islice(bottlenecks, 3):  # Top 3 bottlenecks
         if bottleneck.get('severity') in ['critical', 'warning']:
             issues.append(bottleneck.get('title', 'Unknown issue'))
     
     # Add other issues from insights if less than 3
     if len(issues) < 3:
-        for insight in workload_insights + lab_insights + free_insights:
-            if insight.startswith(('⚠️', '⚡', '🔴')):
+        for insight in chain(workload_insights, lab_insights, free_insights):
+            if insight[:1] in ISSUE_PREFIXES:
                 if insight not in issues:
                     issues.append(insight)
                 if len(issues) >= 3:
@@ -232,8 +293,11 @@ def extract_top_insights(analytics_insights):
             strengths.append("✅ Resource utilization is efficient")
     
     # Look for positive insights
-    for insight in workload_insights + lab_insights + free_insights:
-        if insight.startswith(('✅', '🟢', '📊')) and 'well' in insight.lower() or 'balanced' in insight.lower():
+    for insight in chain(workload_insights, lab_insights, free_insights):
+        if insight[:1] not in STRENGTH_PREFIXES:
+            continue
+        lowered = insight.lower()
+        if 'well' in lowered or 'balanced' in lowered:
             if insight not in strengths:
                 strengths.append(insight)
             if len(strengths) >= 3:
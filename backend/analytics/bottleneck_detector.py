@@ -4,16 +4,47 @@ Bottleneck Detection
 Identifies structural problems and constraints in timetable scheduling.
 """
 
-from collections import defaultdict
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import List
 
+from .slot_index import build_slot_index
 
-def detect_bottlenecks(timetable, context):
+
+# Sort rank per severity; unknown severities sort last
+SEVERITY_ORDER = {'critical': 0, 'warning': 1, 'info': 2}
+
+
+@dataclass(slots=True)
+class Issue:
+    """A detected bottleneck, kept as a slotted record until serialized"""
+
+    type: str
+    severity: str
+    title: str
+    description: str
+    affected_entities: List[str]
+
+    def to_dict(self):
+        """Issue in the API's JSON shape"""
+        return {
+            "type": self.type,
+            "severity": self.severity,
+            "title": self.title,
+            "description": self.description,
+            "affectedEntities": self.affected_entities
+        }
+
+
+def detect_bottlenecks(timetable, context, index=None):
     """
     Detect scheduling bottlenecks and structural issues.
     
     Args:
         timetable: List of slot dictionaries
         context: Dictionary with branchData and smartInputData
+        index: Optional prebuilt SlotIndex for the timetable
     
     Returns:
         {
@@ -31,189 +62,164 @@ def detect_bottlenecks(timetable, context):
             "infoCount": int
         }
     """
-    issues = []
-    
-    # Detect teacher overload
-    teacher_issues = _detect_teacher_overload(timetable, context)
-    issues.extend(teacher_issues)
+    if index is None:
+        index = build_slot_index(timetable)
     
-    # Detect lab shortages
-    lab_issues = _detect_lab_shortage(timetable, context)
-    issues.extend(lab_issues)
-    
-    # Detect student overload
-    student_issues = _detect_student_overload(timetable, context)
-    issues.extend(student_issues)
-    
-    # Detect uneven distribution
-    distribution_issues = _detect_uneven_distribution(timetable, context)
-    issues.extend(distribution_issues)
+    # Teacher overload, lab shortages, student overload, uneven distribution
+    issues = list(chain.from_iterable(detect(index, context) for detect in _DETECTORS))
     
     # Count by severity
-    critical_count = sum(1 for issue in issues if issue['severity'] == 'critical')
-    warning_count = sum(1 for issue in issues if issue['severity'] == 'warning')
-    info_count = sum(1 for issue in issues if issue['severity'] == 'info')
+    severity_counts = Counter(issue.severity for issue in issues)
     
     return {
-        "issues": issues,
-        "criticalCount": critical_count,
-        "warningCount": warning_count,
-        "infoCount": info_count
+        "issues": [issue.to_dict() for issue in issues],
+        "criticalCount": severity_counts['critical'],
+        "warningCount": severity_counts['warning'],
+        "infoCount": severity_counts['info']
     }
 
 
-def _detect_teacher_overload(timetable, context):
+def _detect_teacher_overload(index, context):
     """Detect teachers with excessive daily workload."""
     issues = []
-    teacher_daily_load = defaultdict(lambda: defaultdict(int))
     
-    for slot in timetable:
-        teacher = slot.get('teacher')
-        day = slot.get('day')
-        
-        if teacher and teacher != 'TBA' and day:
-            teacher_daily_load[teacher][day] += 1
-    
-    for teacher, daily_loads in teacher_daily_load.items():
-        for day, count in daily_loads.items():
-            if count > 7:
-                issues.append({
-                    "type": "teacher_overload",
-                    "severity": "critical",
-                    "title": f"Teacher {teacher} heavily overloaded on {day}",
-                    "description": f"{teacher} has {count} lectures scheduled on {day}, which exceeds recommended maximum of 7 lectures per day",
-                    "affectedEntities": [teacher]
-                })
-            elif count > 5:
-                issues.append({
-                    "type": "teacher_overload",
-                    "severity": "warning",
-                    "title": f"Teacher {teacher} has high workload on {day}",
-                    "description": f"{teacher} has {count} lectures on {day}, approaching the recommended limit",
-                    "affectedEntities": [teacher]
-                })
+    for teacher, day, count in _daily_overloads(index.teacher_daily, 5):
+        if count > 7:
+            issues.append(Issue(
+                type="teacher_overload",
+                severity="critical",
+                title=f"Teacher {teacher} heavily overloaded on {day}",
+                description=f"{teacher} has {count} lectures scheduled on {day}, which exceeds recommended maximum of 7 lectures per day",
+                affected_entities=[teacher]
+            ))
+        else:
+            issues.append(Issue(
+                type="teacher_overload",
+                severity="warning",
+                title=f"Teacher {teacher} has high workload on {day}",
+                description=f"{teacher} has {count} lectures on {day}, approaching the recommended limit",
+                affected_entities=[teacher]
+            ))
     
     return issues
 
 
-def _detect_lab_shortage(timetable, context):
+def _detect_lab_shortage(index, context):
     """Detect days with too many practicals competing for limited labs."""
     issues = []
     branch_data = context.get('branchData', {})
     labs = branch_data.get('labs', [])
     num_labs = len(labs)
     
-    # Count practicals per day/time
-    practical_slots = defaultdict(lambda: defaultdict(int))
-    
-    for slot in timetable:
-        if slot.get('type') == 'Practical':
-            day = slot.get('day')
-            time = slot.get('time')
-            if day and time:
-                practical_slots[day][time] += 1
-    
     # Check if practicals exceed lab capacity
-    for day, time_slots in practical_slots.items():
+    for day, time_slots in index.practical_by_daytime.items():
         total_practicals_day = sum(time_slots.values())
         
         for time, count in time_slots.items():
             if count > num_labs:
-                issues.append({
-                    "type": "lab_shortage",
-                    "severity": "critical",
-                    "title": f"Lab capacity exceeded on {day} at {time}",
-                    "description": f"{count} practicals scheduled but only {num_labs} labs available. This creates an impossible scheduling situation.",
-                    "affectedEntities": [f"{day} {time}"]
-                })
+                issues.append(Issue(
+                    type="lab_shortage",
+                    severity="critical",
+                    title=f"Lab capacity exceeded on {day} at {time}",
+                    description=f"{count} practicals scheduled but only {num_labs} labs available. This creates an impossible scheduling situation.",
+                    affected_entities=[f"{day} {time}"]
+                ))
         
         # Check daily concentration
         if total_practicals_day > num_labs * 4:  # More than 4 slots worth on average
-            issues.append({
-                "type": "lab_shortage",
-                "severity": "warning",
-                "title": f"High practical density on {day}",
-                "description": f"{total_practicals_day} practical slots scheduled on {day}. Labs may be heavily utilized with limited flexibility.",
-                "affectedEntities": [day]
-            })
+            issues.append(Issue(
+                type="lab_shortage",
+                severity="warning",
+                title=f"High practical density on {day}",
+                description=f"{total_practicals_day} practical slots scheduled on {day}. Labs may be heavily utilized with limited flexibility.",
+                affected_entities=[day]
+            ))
     
     return issues
 
 
-def _detect_student_overload(timetable, context):
+def _detect_student_overload(index, context):
     """Detect divisions with excessive daily lecture load."""
     issues = []
-    division_daily_load = defaultdict(lambda: defaultdict(int))
     
-    for slot in timetable:
-        year = slot.get('year')
-        division = slot.get('division')
-        day = slot.get('day')
-        
-        if year and division and day:
-            div_key = f"{year}-{division}"
-            division_daily_load[div_key][day] += 1
-    
-    for division, daily_loads in division_daily_load.items():
-        for day, count in daily_loads.items():
-            if count > 7:
-                issues.append({
-                    "type": "student_overload",
-                    "severity": "critical",
-                    "title": f"Division {division} overloaded on {day}",
-                    "description": f"{division} has {count} lectures/practicals on {day}, which may cause student fatigue",
-                    "affectedEntities": [division]
-                })
-            elif count > 6:
-                issues.append({
-                    "type": "student_overload",
-                    "severity": "warning",
-                    "title": f"Division {division} has dense schedule on {day}",
-                    "description": f"{division} has {count} classes on {day}, approaching recommended maximum",
-                    "affectedEntities": [division]
-                })
+    for division, day, count in _daily_overloads(index.division_daily, 6):
+        if count > 7:
+            issues.append(Issue(
+                type="student_overload",
+                severity="critical",
+                title=f"Division {division} overloaded on {day}",
+                description=f"{division} has {count} lectures/practicals on {day}, which may cause student fatigue",
+                affected_entities=[division]
+            ))
+        else:
+            issues.append(Issue(
+                type="student_overload",
+                severity="warning",
+                title=f"Division {division} has dense schedule on {day}",
+                description=f"{division} has {count} classes on {day}, approaching recommended maximum",
+                affected_entities=[division]
+            ))
     
     return issues
 
 
-def _detect_uneven_distribution(timetable, context):
+def _daily_overloads(daily_counts, limit):
+    """
+    Reduce entity -> day -> count aggregates to the (entity, day, count)
+    cells above `limit`, in aggregation order.
+    
+    Most entities never exceed the limit, so each one is gated on its peak
+    day (max() in C) and only the days of the few that do are walked.
+    """
+    hits = []
+    for entity, daily in daily_counts.items():
+        if daily and max(daily.values()) > limit:
+            hits.extend((entity, day, count) for day, count in daily.items() if count > limit)
+    return hits
+
+
+def _detect_uneven_distribution(index, context):
     """Detect uneven workload distribution."""
     issues = []
-    smart_input = context.get('smartInputData', {})
-    teachers = smart_input.get('teachers', [])
-    
-    # Calculate teacher total loads
-    teacher_loads = defaultdict(int)
-    for slot in timetable:
-        teacher = slot.get('teacher')
-        if teacher and teacher != 'TBA':
-            teacher_loads[teacher] += 1
+    teacher_loads = index.teacher_totals
     
     if len(teacher_loads) < 2:
         return issues
     
-    # Calculate variance
-    loads = list(teacher_loads.values())
-    avg_load = sum(loads) / len(loads)
-    max_load = max(loads)
-    min_load = min(loads)
+    # Total and extremes in one pass; ties keep the first teacher, as max()/min() do
+    items = iter(teacher_loads.items())
+    max_teacher = min_teacher = next(items)
+    total = max_teacher[1]
+    for teacher, load in items:
+        total += load
+        if load > max_teacher[1]:
+            max_teacher = (teacher, load)
+        elif load < min_teacher[1]:
+            min_teacher = (teacher, load)
+    avg_load = total / len(teacher_loads)
     
     # High variance indicates uneven distribution
-    if max_load - min_load > avg_load * 0.6:
-        max_teacher = max(teacher_loads.items(), key=lambda x: x[1])
-        min_teacher = min(teacher_loads.items(), key=lambda x: x[1])
-        
-        issues.append({
-            "type": "uneven_distribution",
-            "severity": "warning",
-            "title": "Uneven workload distribution across teachers",
-            "description": f"Workload varies significantly: {max_teacher[0]} has {max_teacher[1]} lectures while {min_teacher[0]} has {min_teacher[1]} lectures",
-            "affectedEntities": [max_teacher[0], min_teacher[0]]
-        })
+    if max_teacher[1] - min_teacher[1] > avg_load * 0.6:
+        issues.append(Issue(
+            type="uneven_distribution",
+            severity="warning",
+            title="Uneven workload distribution across teachers",
+            description=f"Workload varies significantly: {max_teacher[0]} has {max_teacher[1]} lectures while {min_teacher[0]} has {min_teacher[1]} lectures",
+            affected_entities=[max_teacher[0], min_teacher[0]]
+        ))
     
     return issues
 
 
+# Independent detectors over the shared slot index, in report order
+_DETECTORS = (
+    _detect_teacher_overload,
+    _detect_lab_shortage,
+    _detect_student_overload,
+    _detect_uneven_distribution,
+)
+
+
 def prioritize_bottlenecks(bottleneck_data):
     """
     Sort and prioritize bottlenecks by severity.
@@ -226,6 +232,9 @@ def prioritize_bottlenecks(bottleneck_data):
     """
     issues = bottleneck_data.get('issues', [])
     
-    severity_order = {'critical': 0, 'warning': 1, 'info': 2}
+    # Stable bucket sort over the few severity ranks
+    buckets = ([], [], [], [])
+    for issue in issues:
+        buckets[SEVERITY_ORDER.get(issue['severity'], 3)].append(issue)
     
-    return sorted(issues, key=lambda x: severity_order.get(x['severity'], 3))
+    return list(chain.from_iterable(buckets))
@@ -0,0 +1,12 @@
+"""
+Analytics Defaults
+
+Grid used when the branch data does not configure working days or time slots.
+"""
+
+DEFAULT_WORKING_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+DEFAULT_TIME_SLOTS = (
+    "9:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-1:00",
+    "1:00-2:00", "2:00-3:00", "3:00-4:00", "4:00-5:00"
+)
@@ -4,16 +4,21 @@ Free Slot Analysis
 Identifies unused capacity in the timetable for future planning.
 """
 
-from collections import defaultdict
+from collections import Counter
 
+from .defaults import DEFAULT_TIME_SLOTS, DEFAULT_WORKING_DAYS
+from .grid_layout import grid_layout
+from .slot_index import build_slot_index, resource_names
 
-def find_free_slots(timetable, context):
+
+def find_free_slots(timetable, context, index=None):
     """
     Identify all free slots in the timetable.
     
     Args:
         timetable: List of slot dictionaries
         context: Dictionary with branchData and smartInputData
+        index: Optional prebuilt SlotIndex for the timetable
     
     Returns:
         {
@@ -28,87 +33,51 @@ def find_free_slots(timetable, context):
         }
     """
     branch_data = context.get('branchData', {})
-    working_days = branch_data.get('workingDays', ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])
-    time_slots = branch_data.get('timeSlots', [])
+    working_days = branch_data.get('workingDays', DEFAULT_WORKING_DAYS)
+    time_slots = branch_data.get('timeSlots') or DEFAULT_TIME_SLOTS
     divisions = branch_data.get('divisions', {})
     labs = branch_data.get('labs', [])
     rooms = branch_data.get('rooms', [])
     
-    if not time_slots:
-        time_slots = [
-            "9:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-1:00",
-            "1:00-2:00", "2:00-3:00", "3:00-4:00", "4:00-5:00"
-        ]
-    
     # Flatten divisions into list
     all_divisions = []
     for year, divs in divisions.items():
         for div in divs:
             all_divisions.append(f"{year}-{div}")
     
-    # Track occupied slots
-    occupied_division_slots = set()
-    occupied_labs = defaultdict(set)
-    occupied_rooms = defaultdict(set)
-    
-    for slot in timetable:
-        year = slot.get('year')
-        division = slot.get('division')
-        day = slot.get('day')
-        time = slot.get('time')
-        slot_type = slot.get('type')
-        room = slot.get('room')
-        lab = slot.get('lab')
-        
-        if year and division and day and time:
-            div_key = f"{year}-{division}"
-            occupied_division_slots.add((div_key, day, time))
-        
-        if day and time:
-            if slot_type == 'Practical' and (lab or room):
-                occupied_labs[(day, time)].add(lab or room)
-            elif slot_type == 'Lecture' and room:
-                occupied_rooms[(day, time)].add(room)
-    
-    # Calculate free slots per day
-    free_slots_per_day = {}
-    for day in working_days:
-        free_count = 0
-        for time_slot in time_slots:
-            for div in all_divisions:
-                if (div, day, time_slot) not in occupied_division_slots:
-                    free_count += 1
-        free_slots_per_day[day] = free_count
-    
-    # Calculate free slots per division
-    free_slots_per_division = {}
-    for div in all_divisions:
-        free_count = 0
-        for day in working_days:
-            for time_slot in time_slots:
-                if (div, day, time_slot) not in occupied_division_slots:
-                    free_count += 1
-        free_slots_per_division[div] = free_count
+    # Occupied slots
+    if index is None:
+        index = build_slot_index(timetable)
+    occupied_division_slots = index.occupied_div
+    occupied_labs = index.occupied_labs
+    occupied_rooms = index.occupied_rooms
+    
+    # Free slots = grid size minus occupied cells, counted in one pass over the
+    # occupied cells. Multiplicities keep the counts exact if the configuration
+    # repeats a division, day or time.
+    grid = grid_layout(working_days, time_slots)
+    division_mult = Counter(all_divisions)
+    day_mult = grid.day_counts
+    time_mult = grid.time_counts
+    occupied_per_day = Counter()
+    occupied_per_division = Counter()
+    
+    for div, day, time_slot in occupied_division_slots:
+        if time_slot in time_mult:
+            if div in division_mult:
+                occupied_per_day[day] += division_mult[div] * time_mult[time_slot]
+            if day in day_mult:
+                occupied_per_division[div] += day_mult[day] * time_mult[time_slot]
+    
+    slots_per_day = len(all_divisions) * len(time_slots)
+    free_slots_per_day = {day: slots_per_day - occupied_per_day[day] for day in working_days}
+    
+    slots_per_division = len(working_days) * len(time_slots)
+    free_slots_per_division = {div: slots_per_division - occupied_per_division[div] for div in all_divisions}
     
     # Find available labs and rooms
-    available_labs = defaultdict(lambda: defaultdict(list))
-    available_rooms = defaultdict(lambda: defaultdict(list))
-    
-    for day in working_days:
-        for time_slot in time_slots:
-            # Available labs
-            used_labs = occupied_labs.get((day, time_slot), set())
-            for lab in labs:
-                lab_name = lab if isinstance(lab, str) else lab.get('name', lab)
-                if lab_name not in used_labs:
-                    available_labs[day][time_slot].append(lab_name)
-            
-            # Available rooms
-            used_rooms = occupied_rooms.get((day, time_slot), set())
-            for room in rooms:
-                room_name = room if isinstance(room, str) else room.get('name', room)
-                if room_name not in used_rooms:
-                    available_rooms[day][time_slot].append(room_name)
+    available_labs = _available_by_cell(labs, occupied_labs, working_days, time_slots)
+    available_rooms = _available_by_cell(rooms, occupied_rooms, working_days, time_slots)
     
     # Calculate totals
     total_possible_slots = len(all_divisions) * len(working_days) * len(time_slots) if all_divisions else 0
@@ -126,8 +95,8 @@ def find_free_slots(timetable, context):
     return {
         "freeSlotsPerDay": free_slots_per_day,
         "freeSlotsPerDivision": free_slots_per_division,
-        "availableLabs": {day: dict(times) for day, times in available_labs.items()},
-        "availableRooms": {day: dict(times) for day, times in available_rooms.items()},
+        "availableLabs": available_labs,
+        "availableRooms": available_rooms,
         "totalFreeSlots": total_free,
         "totalOccupiedSlots": total_occupied,
         "freePercentage": round(free_percentage, 1),
@@ -135,6 +104,57 @@ def find_free_slots(timetable, context):
     }
 
 
+def _available_by_cell(resources, occupied, working_days, time_slots):
+    """
+    List the configured resources (labs or rooms) free in each (day, time) cell.
+    
+    The configured resources in use in a cell are found with one set
+    intersection. The free list for a given in-use set is built once and
+    copied into every cell with the same set, since most cells share a few
+    (usually the empty one). Lists keep the configured order.
+    
+    Args:
+        resources: Configured labs/rooms (names or {"name": ...} dicts)
+        occupied: {(day, time): set of names in use}
+        working_days: Days of the grid
+        time_slots: Times of the grid
+    
+    Returns:
+        {day: {time: [names]}}, omitting cells (and days) with nothing free
+    """
+    names = resource_names(resources)
+    configured = frozenset(names)
+    none_used = frozenset()
+    
+    # Loop-invariant lookups bound once for the day x time sweep
+    occupied_get = occupied.get
+    free_by_used = {}
+    free_by_used_get = free_by_used.get
+    available = {}
+    for day in working_days:
+        cells = available.get(day, {})
+        for time_slot in time_slots:
+            in_use = occupied_get((day, time_slot))
+            used = configured.intersection(in_use) if in_use else none_used
+            
+            free = free_by_used_get(used)
+            if free is None:
+                free = free_by_used[used] = [name for name in names if name not in used]
+            if not free:
+                continue
+            
+            if time_slot in cells:
+                # Repeated day/time in the configuration
+                cells[time_slot].extend(free)
+            else:
+                cells[time_slot] = list(free)
+        
+        if cells:
+            available[day] = cells
+    
+    return available
+
+
 def analyze_free_capacity(free_slot_metrics):
     """
     Analyze free capacity and generate insights.
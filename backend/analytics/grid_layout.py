@@ -0,0 +1,61 @@
+"""
+Grid Layout
+
+Per-shape lookup tables for the working-day x time-slot grid. A branch keeps
+the same days and times for a whole semester, so the tables are built once
+per distinct grid and reused by every report.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class GridLayout:
+    """Positions and multiplicities of the days and times of a grid (read-only)"""
+
+    # day -> positions in working_days (several if the configuration repeats it)
+    day_positions: Dict[str, Tuple[int, ...]]
+    # time -> positions in time_slots
+    time_positions: Dict[str, Tuple[int, ...]]
+    # day -> times it appears in working_days
+    day_counts: Dict[str, int]
+    # time -> times it appears in time_slots
+    time_counts: Dict[str, int]
+    # {time: 0} for every time slot; copy before filling in
+    empty_row: Dict[str, int]
+
+
+def grid_layout(working_days, time_slots):
+    """
+    Lookup tables for a working-day x time-slot grid.
+    
+    Args:
+        working_days: Days of the grid
+        time_slots: Times of the grid
+    
+    Returns:
+        GridLayout, shared between calls with the same grid
+    """
+    return _grid_layout(tuple(working_days), tuple(time_slots))
+
+
+@lru_cache(maxsize=16)
+def _grid_layout(working_days, time_slots):
+    day_positions = _positions(working_days)
+    time_positions = _positions(time_slots)
+    return GridLayout(
+        day_positions=day_positions,
+        time_positions=time_positions,
+        day_counts={day: len(positions) for day, positions in day_positions.items()},
+        time_counts={time: len(positions) for time, positions in time_positions.items()},
+        empty_row=dict.fromkeys(time_slots, 0)
+    )
+
+
+def _positions(names):
+    positions = {}
+    for i, name in enumerate(names):
+        positions[name] = positions.get(name, ()) + (i,)
+    return positions
@@ -6,20 +6,25 @@ Analyzes lab utilization patterns and generates usage heatmaps.
 
 from collections import defaultdict
 
+from .defaults import DEFAULT_TIME_SLOTS, DEFAULT_WORKING_DAYS
+from .grid_layout import grid_layout
+from .slot_index import build_slot_index, resource_names
 
-def compute_lab_heatmap(timetable, context):
+
+def compute_lab_heatmap(timetable, context, index=None):
     """
     Generate lab usage heatmap data.
     
     Args:
         timetable: List of slot dictionaries
         context: Dictionary with branchData and smartInputData
+        index: Optional prebuilt SlotIndex for the timetable
     
     Returns:
         {
             "perLab": {
                 "labName": {
-                    "heatmap": {"Monday": {"9:00-10:00": 1.0, ...}, ...},
+                    "heatmap": {"Monday": {"9:00-10:00": 1, ...}, ...},  (1 = occupied, 0 = free)
                     "utilizationPercent": float,
                     "peakHours": [{"day": str, "time": str, "subjects": [str]}],
                     "idleSlots": int
@@ -32,68 +37,70 @@ def compute_lab_heatmap(timetable, context):
     """
     branch_data = context.get('branchData', {})
     labs = branch_data.get('labs', [])
-    working_days = branch_data.get('workingDays', ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])
-    time_slots = branch_data.get('timeSlots', [])
-    
-    # If time slots not in branch data, create default
-    if not time_slots:
-        time_slots = [
-            "9:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-1:00",
-            "1:00-2:00", "2:00-3:00", "3:00-4:00", "4:00-5:00"
-        ]
-    
-    # Initialize heatmap structure
-    lab_heatmaps = {}
+    working_days = branch_data.get('workingDays', DEFAULT_WORKING_DAYS)
+    # If time slots not in branch data, use the default grid
+    time_slots = branch_data.get('timeSlots') or DEFAULT_TIME_SLOTS
+    
+    # Occupied (day, time) cells per lab. Most of the grid is free, so only
+    # the occupied cells are stored and the dense heatmap is built per lab
+    # for the response.
+    lab_cells = {lab_name: set() for lab_name in resource_names(labs)}
     lab_usage_count = defaultdict(int)
-    lab_slot_subjects = defaultdict(list)
     
-    for lab in labs:
-        lab_name = lab if isinstance(lab, str) else lab.get('name', lab)
-        lab_heatmaps[lab_name] = {
-            day: {time: 0.0 for time in time_slots}
-            for day in working_days
-        }
+    # Record the cells used by the practicals held in each lab
+    if index is None:
+        index = build_slot_index(timetable)
+    lab_slot_subjects = index.lab_slot_subjects
     
-    # Populate heatmap from timetable
-    for slot in timetable:
-        if slot.get('type') == 'Practical':
-            lab = slot.get('room') or slot.get('lab')
-            day = slot.get('day')
-            time = slot.get('time')
-            subject = slot.get('subject', 'Unknown')
-            
-            if lab and day and time and lab in lab_heatmaps:
-                lab_heatmaps[lab][day][time] = 1.0  # Fully occupied
-                lab_usage_count[lab] += 1
-                lab_slot_subjects[(lab, day, time)].append(subject)
+    for (lab, day, time), subjects in lab_slot_subjects.items():
+        cells = lab_cells.get(lab)
+        if cells is not None:
+            cells.add((day, time))
+            lab_usage_count[lab] += len(subjects)
     
     # Calculate metrics per lab
     per_lab_metrics = {}
     total_slots = len(working_days) * len(time_slots)
     overall_used_slots = 0
     
-    for lab_name, heatmap in lab_heatmaps.items():
+    # Heatmap cells are 0/1 ints: occupancy is binary, and "0"/"1" serialize
+    # shorter than "0.0"/"1.0". Grid positions list peak hours in day/time
+    # order from the occupied cells alone.
+    grid = grid_layout(working_days, time_slots)
+    free_row = grid.empty_row
+    day_positions = grid.day_positions
+    time_positions = grid.time_positions
+    
+    for lab_name, cells in lab_cells.items():
         used_slots = lab_usage_count.get(lab_name, 0)
         overall_used_slots += used_slots
         utilization = (used_slots / total_slots * 100) if total_slots > 0 else 0
         idle_slots = total_slots - used_slots
         
+        heatmap = {day: free_row.copy() for day in working_days}
+        for day, time in cells:
+            heatmap[day][time] = 1  # Fully occupied
+        
         # Find peak hours (fully occupied slots)
-        peak_hours = []
-        for day in working_days:
-            for time_slot in time_slots:
-                if heatmap[day][time_slot] == 1.0:
-                    subjects = lab_slot_subjects.get((lab_name, day, time_slot), [])
-                    peak_hours.append({
-                        "day": day,
-                        "time": time_slot,
-                        "subjects": subjects
-                    })
+        peak_cells = sorted(
+            (day_pos, time_pos, day, time)
+            for day, time in cells
+            for day_pos in day_positions.get(day, ())
+            for time_pos in time_positions.get(time, ())
+        )
+        peak_hours = [
+            {
+                "day": day,
+                "time": time,
+                "subjects": lab_slot_subjects[(lab_name, day, time)]
+            }
+            for _, _, day, time in peak_cells[:10]
+        ]
         
         per_lab_metrics[lab_name] = {
             "heatmap": heatmap,
             "utilizationPercent": round(utilization, 1),
-            "peakHours": peak_hours[:10],  # Limit to top 10
+            "peakHours": peak_hours,  # Limited to the first 10
             "idleSlots": idle_slots
         }
     
@@ -0,0 +1,107 @@
+"""
+Slot Index
+
+Single-pass aggregation of a timetable into the counters and occupancy sets
+used by the analytics modules, so a full report scans the slots only once.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+
+@dataclass
+class SlotIndex:
+    """Per-teacher, per-division and per-resource aggregates of a timetable"""
+
+    # teacher -> day -> lectures (excluding TBA; slots with a day only)
+    teacher_daily: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    # teacher -> lectures (excluding TBA; regardless of day)
+    teacher_totals: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # "year-division" -> day -> classes
+    division_daily: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    # {("year-division", day, time)} with at least one class
+    occupied_div: Set[Tuple[str, str, str]] = field(default_factory=set)
+    # day -> time -> practicals
+    practical_by_daytime: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    # (lab, day, time) -> subjects of practicals held there (lab = room or lab)
+    lab_slot_subjects: Dict[Tuple[str, str, str], List[str]] = field(default_factory=lambda: defaultdict(list))
+    # (day, time) -> labs in use by practicals (lab = lab or room)
+    occupied_labs: Dict[Tuple[str, str], Set[str]] = field(default_factory=lambda: defaultdict(set))
+    # (day, time) -> rooms in use by lectures
+    occupied_rooms: Dict[Tuple[str, str], Set[str]] = field(default_factory=lambda: defaultdict(set))
+
+
+def build_slot_index(timetable):
+    """
+    Aggregate a timetable in one pass.
+
+    Args:
+        timetable: List of slot dictionaries
+
+    Returns:
+        SlotIndex
+    """
+    index = SlotIndex()
+    teacher_daily = index.teacher_daily
+    teacher_totals = index.teacher_totals
+    division_daily = index.division_daily
+    occupied_div = index.occupied_div
+    practical_by_daytime = index.practical_by_daytime
+    lab_slot_subjects = index.lab_slot_subjects
+    occupied_labs = index.occupied_labs
+    occupied_rooms = index.occupied_rooms
+
+    # One bound `get` per slot, and resource fields are only read for slots
+    # that can use them (a day for division counts, a time for occupancy)
+    for slot in timetable:
+        get = slot.get
+        teacher = get('teacher')
+        day = get('day')
+
+        if teacher and teacher != 'TBA':
+            teacher_totals[teacher] += 1
+            if day:
+                teacher_daily[teacher][day] += 1
+
+        if not day:
+            continue
+        time = get('time')
+        year = get('year')
+        division = get('division')
+
+        if year and division:
+            div_key = f"{year}-{division}"
+            division_daily[div_key][day] += 1
+            if time:
+                occupied_div.add((div_key, day, time))
+
+        if time:
+            slot_type = get('type')
+            if slot_type == 'Practical':
+                practical_by_daytime[day][time] += 1
+                room = get('room')
+                lab = get('lab')
+                if room or lab:
+                    lab_slot_subjects[(room or lab, day, time)].append(get('subject', 'Unknown'))
+                    occupied_labs[(day, time)].add(lab or room)
+            elif slot_type == 'Lecture':
+                room = get('room')
+                if room:
+                    occupied_rooms[(day, time)].add(room)
+
+    return index
+
+
+def resource_names(resources):
+    """
+    Names of configured labs/rooms, which may be given as names or
+    {"name": ...} dicts.
+    
+    Args:
+        resources: List of names or dictionaries
+    
+    Returns:
+        List of names, in configuration order
+    """
+    return [r if isinstance(r, str) else r.get('name', r) for r in resources]
@@ -4,16 +4,20 @@ Teacher Workload Analysis
 Analyzes teacher workload distribution and identifies overload/underutilization.
 """
 
-from collections import defaultdict
+from itertools import repeat
 
+from .defaults import DEFAULT_WORKING_DAYS
+from .slot_index import build_slot_index
 
-def compute_teacher_workload(timetable, context):
+
+def compute_teacher_workload(timetable, context, index=None):
     """
     Calculate teacher workload metrics.
     
     Args:
         timetable: List of slot dictionaries
         context: Dictionary with branchData and smartInputData
+        index: Optional prebuilt SlotIndex for the timetable
     
     Returns:
         {
@@ -26,6 +30,7 @@ def compute_teacher_workload(timetable, context):
                     "classification": "balanced" | "slight_overload" | "heavy_overload"
                 }
             },
+            "classificationCounts": {"balanced": int, "slight_overload": int, "heavy_overload": int},
             "averageLectures": float,
             "mostOverloaded": {"teacher": str, "count": int},
             "leastUtilized": {"teacher": str, "count": int}
@@ -34,50 +39,75 @@ def compute_teacher_workload(timetable, context):
     smart_input = context.get('smartInputData', {})
     branch_data = context.get('branchData', {})
     teachers = smart_input.get('teachers', [])
-    working_days = branch_data.get('workingDays', ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])
-    
-    # Track lectures per teacher per day
-    teacher_daily_lectures = defaultdict(lambda: defaultdict(int))
-    teacher_total_lectures = defaultdict(int)
+    working_days = branch_data.get('workingDays', DEFAULT_WORKING_DAYS)
     
-    for slot in timetable:
-        teacher = slot.get('teacher')
-        day = slot.get('day')
-        
-        if teacher and teacher != 'TBA' and day:
-            teacher_daily_lectures[teacher][day] += 1
-            teacher_total_lectures[teacher] += 1
+    # Lectures per teacher per day
+    if index is None:
+        index = build_slot_index(timetable)
+    teacher_daily_lectures = index.teacher_daily
     
     # Calculate metrics for each teacher
     per_teacher_metrics = {}
+    classification_counts = {"balanced": 0, "slight_overload": 0, "heavy_overload": 0}
     total_lectures_all = 0
     teacher_count = len(teachers)
     
+    # Each teacher's lectures as a row over the working days, read from the
+    # slot index with one C-level map per teacher
+    no_lectures = {}
+    num_days = len(working_days)
+    classification_by_load = {}
+    
+    # Most overloaded and least utilized, tracked as totals are computed
+    most_overloaded = None
+    least_utilized = None
+    max_load = -1
+    min_load = float('inf')
+    repeated_names = False
+    
     for teacher_data in teachers:
         teacher_name = teacher_data.get('name')
-        total = teacher_total_lectures.get(teacher_name, 0)
+        daily_lectures = teacher_daily_lectures.get(teacher_name, no_lectures)
+        row = list(map(daily_lectures.get, working_days, repeat(0)))
+        total = sum(daily_lectures.values())
         total_lectures_all += total
         
-        daily_lectures = dict(teacher_daily_lectures.get(teacher_name, {}))
-        
-        # Find peak day
-        peak_day = None
-        peak_count = 0
-        for day in working_days:
-            count = daily_lectures.get(day, 0)
-            if count > peak_count:
-                peak_count = count
-                peak_day = day
+        # Find peak day (first day with the highest count)
+        peak_count = max(row, default=0)
+        peak_day = working_days[row.index(peak_count)] if peak_count > 0 else None
         
-        # Find idle days
-        idle_days = [day for day in working_days if daily_lectures.get(day, 0) == 0]
+        # Find idle days; most teachers work every day or (unassigned) none,
+        # which the row answers without walking the days
+        if 0 not in row:
+            idle_days = []
+        elif peak_count == 0:
+            idle_days = list(working_days)
+        else:
+            idle_days = [day for day, count in zip(working_days, row) if not count]
         
-        # Classify workload
-        classification = classify_workload(peak_count, total, len(working_days))
+        # Classify workload; the thresholds depend only on (peak, total), which
+        # teachers often share, so each pair is classified once per call
+        load = (peak_count, total)
+        classification = classification_by_load.get(load)
+        if classification is None:
+            classification = classification_by_load[load] = classify_workload(peak_count, total, num_days)
+        previous = per_teacher_metrics.get(teacher_name)
+        if previous is not None:
+            # Repeated name: its entry (and classification) is replaced
+            classification_counts[previous['classification']] -= 1
+            repeated_names = True
+        else:
+            if total > max_load:
+                max_load = total
+                most_overloaded = {"teacher": teacher_name, "count": total}
+            if total < min_load:
+                min_load = total
+                least_utilized = {"teacher": teacher_name, "count": total}
+        classification_counts[classification] += 1
         
         per_teacher_metrics[teacher_name] = {
             "totalLectures": total,
-            "lecturesPerDay": {day: daily_lectures.get(day, 0) for day in working_days},
+            "lecturesPerDay": dict(zip(working_days, row)),
             "peakDay": {"day": peak_day, "count": peak_count} if peak_day else None,
             "idleDays": idle_days,
             "classification": classification
@@ -86,7 +116,21 @@ def compute_teacher_workload(timetable, context):
     # Calculate average
     avg_lectures = total_lectures_all / teacher_count if teacher_count > 0 else 0
     
-    # Find most overloaded and least utilized
+    if repeated_names:
+        # Replaced entries may have changed totals; rescan the final ones
+        most_overloaded, least_utilized = _load_extremes(per_teacher_metrics)
+    
+    return {
+        "perTeacher": per_teacher_metrics,
+        "classificationCounts": classification_counts,
+        "averageLectures": round(avg_lectures, 1),
+        "mostOverloaded": most_overloaded,
+        "leastUtilized": least_utilized
+    }
+
+
+def _load_extremes(per_teacher_metrics):
+    """First teachers with the highest and lowest total lectures"""
     most_overloaded = None
     least_utilized = None
     max_load = -1
@@ -101,12 +145,7 @@ def compute_teacher_workload(timetable, context):
             min_load = total
             least_utilized = {"teacher": teacher_name, "count": total}
     
-    return {
-        "perTeacher": per_teacher_metrics,
-        "averageLectures": round(avg_lectures, 1),
-        "mostOverloaded": most_overloaded,
-        "leastUtilized": least_utilized
-    }
+    return most_overloaded, least_utilized
 
 
 def classify_workload(peak_day_count, total_lectures, num_days):
@@ -147,7 +186,9 @@ def generate_workload_insights(workload_metrics):
     insights = []
     per_teacher = workload_metrics.get('perTeacher', {})
     
-    # Check for overloaded teachers
+    # Overloaded and underutilized teachers, collected in one pass and
+    # reported in that order
+    underutilized = []
     for teacher_name, metrics in per_teacher.items():
         classification = metrics.get('classification')
         peak = metrics.get('peakDay')
@@ -156,16 +197,17 @@ def generate_workload_insights(workload_metrics):
             insights.append(f"⚠️ Teacher {teacher_name} has {peak['count']} lectures on {peak['day']} (heavy overload)")
         elif classification == 'slight_overload' and peak:
             insights.append(f"⚡ Teacher {teacher_name} has {peak['count']} lectures on {peak['day']} (slight overload)")
-    
-    # Check for underutilized teachers
-    for teacher_name, metrics in per_teacher.items():
+        
         total = metrics.get('totalLectures', 0)
-        idle_days = metrics.get('idleDays', [])
         
         if total == 0:
-            insights.append(f"ℹ️ Teacher {teacher_name} has no assigned lectures (completely unused)")
-        elif len(idle_days) >= 3:
-            insights.append(f"ℹ️ Teacher {teacher_name} has {len(idle_days)} idle days (under-utilized)")
+            underutilized.append(f"ℹ️ Teacher {teacher_name} has no assigned lectures (completely unused)")
+        else:
+            idle_count = len(metrics.get('idleDays', []))
+            if idle_count >= 3:
+                underutilized.append(f"ℹ️ Teacher {teacher_name} has {idle_count} idle days (under-utilized)")
+    
+    insights.extend(underutilized)
     
     # Overall distribution
     most_overloaded = workload_metrics.get('mostOverloaded')
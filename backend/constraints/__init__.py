@@ -5,7 +5,7 @@ This module defines the rule-based validation system for timetable generation.
 It enforces hard constraints (must never be violated) and soft constraints (optimization goals).
 """
 
-from .base import Constraint, ConstraintViolation
+from .base import Constraint
 from .hard_constraints import (
     TeacherNonOverlapConstraint,
     RoomNonOverlapConstraint,
@@ -13,17 +13,25 @@ from .hard_constraints import (
     WeeklyLectureCompletionConstraint,
     StructuralValidityConstraint
 )
-from .soft_constraints import (
-    BalancedTeacherLoadConstraint,
-    BalancedDailyLoadConstraint,
-    SubjectRepetitionConstraint,
-    PreferenceConstraint
-)
 from .constraint_engine import ConstraintEngine
 
+# Soft constraints are imported on first access (PEP 562), like the engine's
+_SOFT_CONSTRAINTS = (
+    'BalancedTeacherLoadConstraint',
+    'BalancedDailyLoadConstraint',
+    'SubjectRepetitionConstraint',
+    'PreferenceConstraint'
+)
+
+
+def __getattr__(name):
+    if name in _SOFT_CONSTRAINTS:
+        from . import soft_constraints
+        return getattr(soft_constraints, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     'Constraint',
-    'ConstraintViolation',
     'TeacherNonOverlapConstraint',
     'RoomNonOverlapConstraint',
     'PracticalBatchSyncConstraint',
@@ -4,24 +4,61 @@ Base Constraint Classes
 Defines the interface that all constraints must implement.
 """
 
+from itertools import repeat
 
-class ConstraintViolation:
-    """Represents a single constraint violation"""
+
+def shared(context, key, compute):
+    """
+    Value of compute() shared by the constraints of one engine run.
     
-    def __init__(self, message, entities=None, slot=None, severity="HARD"):
-        self.message = message
-        self.entities = entities or {}
-        self.slot = slot
-        self.severity = severity
+    ConstraintEngine passes a fresh '_shared' dict in the context of each run,
+    so per-timetable encodings are built once rather than once per constraint.
+    Without it (a constraint checked on its own) compute() simply runs.
+    """
+    cache = context.get('_shared')
+    if cache is None:
+        return compute()
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = compute()
+    return value
+
+
+def slot_column(timetable, context, field):
+    """
+    slot.get(field) of every slot, in timetable order: one column of the
+    timetable, extracted once per engine run (see shared) for the constraints
+    that key on it.
+    """
+    # dict.get mapped over the slots runs without a bytecode loop or a
+    # method lookup per slot
+    return shared(context, ('column', field), lambda: list(map(dict.get, timetable, repeat(field))))
+
+
+def lecture_slots(timetable, context):
+    """The timetable's non-practical slots, filtered once per engine run (see shared)."""
+    return shared(context, 'lecture_slots', lambda: [slot for slot in timetable if slot.get('type') != 'Practical'])
+
+
+def fail_fast(context):
+    """
+    Whether the caller only needs to know if a check fails.
     
-    def to_dict(self):
-        """Convert violation to dictionary format"""
-        return {
-            "message": self.message,
-            "entities": self.entities,
-            "slot": self.slot,
-            "severity": self.severity
-        }
+    ConstraintEngine sets '_fail_fast' in 'fast' mode, where the violations of
+    an invalid timetable are discarded; hard checks then return as soon as
+    they have found one group of violations instead of scanning the rest.
+    """
+    return context.get('_fail_fast', False)
+
+
+def violation_dict(message, entities=None, slot=None, severity="HARD"):
+    """A violation as reported in a check() result's 'violations' list"""
+    return {
+        "message": message,
+        "entities": entities or {},
+        "slot": slot,
+        "severity": severity
+    }
 
 
 class Constraint:
@@ -67,7 +104,7 @@ class Constraint:
             Dictionary:
             {
                 "valid": bool,
-                "violations": [ConstraintViolation],
+                "violations": [dict] (violation_dict() form),
                 "score": float (0-100, only for soft constraints)
             }
         """
@@ -5,21 +5,36 @@ Main orchestrator that manages all constraints, runs validation,
 and generates comprehensive reports.
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+import orjson
+
 from .hard_constraints import (
+    group_by_time_slot,
     TeacherNonOverlapConstraint,
     RoomNonOverlapConstraint,
     PracticalBatchSyncConstraint,
     WeeklyLectureCompletionConstraint,
     StructuralValidityConstraint
 )
-from .soft_constraints import (
-    BalancedTeacherLoadConstraint,
-    BalancedDailyLoadConstraint,
-    SubjectRepetitionConstraint,
-    PreferenceConstraint,
-    ConsecutiveLectureConstraint,
-    StudentConsecutiveConstraint
-)
+
+
+# Results memoized per engine; search loops re-evaluate the same timetables
+RESULT_CACHE_SIZE = 256
+
+# validate_timetable modes: run everything, or stop at the first hard failure
+VALIDATION_MODES = ('full', 'fast')
+
+# Existing timetables kept indexed for validate_slot; a search loop tries many
+# candidate slots against the same few timetables
+PREPARED_CACHE_SIZE = 8
+
+# Timetables whose soft check results are kept, so validating and scoring
+# the same timetable (in either order, in any mode) runs the soft checks once
+SOFT_RESULT_CACHE_SIZE = 64
 
 
 class ConstraintEngine:
@@ -31,32 +46,74 @@ class ConstraintEngine:
     """
     
     def __init__(self):
+        teacher_non_overlap = TeacherNonOverlapConstraint()
+        room_non_overlap = RoomNonOverlapConstraint()
+        structural_validity = StructuralValidityConstraint()
+        
         # Register all hard constraints
         self.hard_constraints = [
-            TeacherNonOverlapConstraint(),
-            RoomNonOverlapConstraint(),
+            teacher_non_overlap,
+            room_non_overlap,
             PracticalBatchSyncConstraint(),
             WeeklyLectureCompletionConstraint(),
-            StructuralValidityConstraint()
+            structural_validity
         ]
         
-        # Register all soft constraints
-        self.soft_constraints = [
-            BalancedTeacherLoadConstraint(),
-            BalancedDailyLoadConstraint(),
-            SubjectRepetitionConstraint(),
-            PreferenceConstraint(),
-            ConsecutiveLectureConstraint(),
-            StudentConsecutiveConstraint()
+        # Hard constraints that can be checked when adding a single slot
+        # (shared with the list above, so enable/disable applies to both)
+        self.incremental_constraints = [
+            teacher_non_overlap,
+            room_non_overlap,
+            structural_validity
         ]
+        
+        # Soft constraints are registered on first use (see soft_constraints)
+        self._soft_constraints = None
+        
+        self._results = OrderedDict()
+        self._prepared = OrderedDict()
+        self._soft_results = OrderedDict()
+        self._results_lock = threading.Lock()
+    
+    @property
+    def soft_constraints(self):
+        """
+        All soft constraints, imported and registered on first use, so
+        processes that only validate slots never load them.
+        """
+        if self._soft_constraints is None:
+            from .soft_constraints import (
+                BalancedTeacherLoadConstraint,
+                BalancedDailyLoadConstraint,
+                SubjectRepetitionConstraint,
+                PreferenceConstraint,
+                ConsecutiveLectureConstraint,
+                StudentConsecutiveConstraint
+            )
+            
+            # Register all soft constraints
+            self._soft_constraints = [
+                BalancedTeacherLoadConstraint(),
+                BalancedDailyLoadConstraint(),
+                SubjectRepetitionConstraint(),
+                PreferenceConstraint(),
+                ConsecutiveLectureConstraint(),
+                StudentConsecutiveConstraint()
+            ]
+        return self._soft_constraints
     
-    def validate_timetable(self, timetable, context):
+    def validate_timetable(self, timetable, context, mode='full'):
         """
         Validate a complete timetable against all constraints.
         
         Args:
             timetable: List of slot dictionaries
             context: Dictionary with branchData and smartInputData
+            mode: 'full' runs every constraint; 'fast' stops at the first
+                failing hard constraint, which itself stops at its first
+                group of violations (reporting only those, with no soft
+                violations and a None qualityScore), for search loops that
+                discard invalid candidates
         
         Returns:
             {
@@ -66,7 +123,23 @@ class ConstraintEngine:
                 "qualityScore": float (0-100),
                 "summary": {...}
             }
+        
+        Results are memoized by content, so the returned dict may be shared
+        between callers and must be treated as read-only.
         """
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode '{mode}'")
+        
+        kind = 'timetable' if mode == 'full' else 'timetable_fast'
+        digest = _digest((timetable, context))
+        return self._cached_by_key(
+            self._result_key(kind, digest),
+            lambda: self._validate_timetable(timetable, context, mode, digest)
+        )
+    
+    def _validate_timetable(self, timetable, context, mode='full', digest=None):
+        # Encodings of this timetable shared by the constraints (see base.shared)
+        context = {**context, '_shared': {}, '_fail_fast': mode == 'fast'}
         hard_violations = []
         soft_violations = []
         soft_scores = []
@@ -81,13 +154,16 @@ class ConstraintEngine:
                 for violation in result['violations']:
                     violation['constraint'] = constraint.name
                     hard_violations.append(violation)
+                
+                if mode == 'fast':
+                    return self._invalid_result(timetable, hard_violations)
         
         # Run all soft constraints
         for constraint in self.soft_constraints:
             if not constraint.enabled:
                 continue
             
-            result = constraint.check(timetable, context)
+            result = self._check_soft(constraint, timetable, context, digest)
             soft_scores.append(result['score'])
             
             for violation in result['violations']:
@@ -95,14 +171,14 @@ class ConstraintEngine:
                 soft_violations.append(violation)
         
         # Calculate overall quality score (average of soft constraint scores)
-        quality_score = sum(soft_scores) / len(soft_scores) if soft_scores else 100
+        quality_score = round(sum(soft_scores) / len(soft_scores), 2) if soft_scores else 100
         
         # Generate summary
         summary = {
             "totalSlots": len(timetable),
             "hardViolations": len(hard_violations),
             "softViolations": len(soft_violations),
-            "qualityScore": round(quality_score, 2),
+            "qualityScore": quality_score,
             "constraintsChecked": {
                 "hard": len(self.hard_constraints),
                 "soft": len(self.soft_constraints)
@@ -113,10 +189,29 @@ class ConstraintEngine:
             "valid": len(hard_violations) == 0,
             "hardViolations": hard_violations,
             "softViolations": soft_violations,
-            "qualityScore": round(quality_score, 2),
+            "qualityScore": quality_score,
             "summary": summary
         }
     
+    def _invalid_result(self, timetable, hard_violations):
+        """validate_timetable's result when 'fast' mode stops at a hard violation"""
+        return {
+            "valid": False,
+            "hardViolations": hard_violations,
+            "softViolations": [],
+            "qualityScore": None,
+            "summary": {
+                "totalSlots": len(timetable),
+                "hardViolations": len(hard_violations),
+                "softViolations": 0,
+                "qualityScore": None,
+                "constraintsChecked": {
+                    "hard": len(self.hard_constraints),
+                    "soft": len(self.soft_constraints)
+                }
+            }
+        }
+    
     def validate_slot(self, new_slot, existing_timetable, context):
         """
         Validate adding a single slot to an existing timetable.
@@ -135,33 +230,40 @@ class ConstraintEngine:
                 "violations": [...],
                 "conflicts": [...]  # Immediate conflicts with existing slots
             }
+        
+        Results are memoized by content like validate_timetable's.
         """
-        # Create temporary timetable with new slot
-        temp_timetable = existing_timetable + [new_slot]
+        # The existing timetable is digested once, keying both the result and
+        # its prepared indexes; only the (small) new slot is digested apart
+        existing_digest = _digest((existing_timetable, context))
+        slot_digest = _digest(new_slot)
+        key = None
+        if existing_digest is not None and slot_digest is not None:
+            key = ('slot', self._disabled_names(), existing_digest + slot_digest)
         
+        return self._cached_by_key(key, lambda: self._validate_slot(new_slot, existing_timetable, context, existing_digest))
+    
+    def _validate_slot(self, new_slot, existing_timetable, context, existing_digest=None):
         violations = []
         conflicts = []
+        prepared = None
         
         # Run subset of hard constraints (only those that can be checked incrementally)
-        incremental_constraints = [
-            TeacherNonOverlapConstraint(),
-            RoomNonOverlapConstraint(),
-            StructuralValidityConstraint()
-        ]
-        
-        for constraint in incremental_constraints:
+        for constraint in self.incremental_constraints:
             if not constraint.enabled:
                 continue
             
-            result = constraint.check(temp_timetable, context)
-            if not result['valid']:
-                for violation in result['violations']:
-                    violation['constraint'] = constraint.name
-                    violations.append(violation)
-                    
-                    # Check if violation involves the new slot
-                    if self._involves_new_slot(violation, new_slot):
-                        conflicts.append(violation)
+            if prepared is None:
+                prepared = self._prepare_timetable(existing_digest)
+            
+            for violation in self._check_with_slot(constraint, prepared, new_slot, existing_timetable, context):
+                # Copy, as the existing timetable's violations are shared between calls
+                violation = dict(violation, constraint=constraint.name)
+                violations.append(violation)
+                
+                # Check if violation involves the new slot
+                if self._involves_new_slot(violation, new_slot):
+                    conflicts.append(violation)
         
         return {
             "valid": len(violations) == 0,
@@ -169,6 +271,69 @@ class ConstraintEngine:
             "conflicts": conflicts
         }
     
+    def _check_with_slot(self, constraint, prepared, new_slot, existing_timetable, context):
+        """
+        Violations of `constraint` over existing_timetable + [new_slot], in the
+        order a full check would report them, re-checking only what the new
+        slot can change.
+        """
+        if hasattr(constraint, 'check_time_slot'):
+            # Only the new slot's (day, slot) group can change
+            key = (new_slot['day'], new_slot['slot'])
+            groups = prepared['groups']
+            if groups is None:
+                groups = prepared['groups'] = group_by_time_slot(existing_timetable)
+            per_group = prepared['violations'].get(constraint.name)
+            if per_group is None:
+                per_group = prepared['violations'][constraint.name] = {
+                    group: constraint.check_time_slot(*group, slots) for group, slots in groups.items()
+                }
+            
+            found = []
+            for group, group_violations in per_group.items():
+                if group == key:
+                    found.extend(constraint.check_time_slot(*key, groups[key] + [new_slot]))
+                else:
+                    found.extend(group_violations)
+            if key not in groups:
+                found.extend(constraint.check_time_slot(*key, [new_slot]))
+            return found
+        
+        if hasattr(constraint, 'check_slot'):
+            # Per-slot check: the new slot's violations follow the existing ones
+            existing = prepared['violations'].get(constraint.name)
+            if existing is None:
+                existing = prepared['violations'][constraint.name] = constraint.check(existing_timetable, context)['violations']
+            valid = prepared['valid']
+            if valid is None:
+                valid = prepared['valid'] = constraint.valid_entities(context)
+            return chain(existing, constraint.check_slot(new_slot, valid))
+        
+        return constraint.check(existing_timetable + [new_slot], context)['violations']
+    
+    def _prepare_timetable(self, key):
+        """
+        Indexes and per-constraint violations of an existing timetable, filled
+        in lazily and reused across validate_slot calls for the same timetable
+        (`key` is its digest with the context; None means not reusable).
+        """
+        if key is not None:
+            with self._results_lock:
+                prepared = self._prepared.get(key)
+                if prepared is not None:
+                    self._prepared.move_to_end(key)
+                    return prepared
+        
+        prepared = {"groups": None, "valid": None, "violations": {}}
+        
+        if key is not None:
+            with self._results_lock:
+                self._prepared[key] = prepared
+                if len(self._prepared) > PREPARED_CACHE_SIZE:
+                    self._prepared.popitem(last=False)
+        
+        return prepared
+    
     def _involves_new_slot(self, violation, new_slot):
         """Check if a violation involves the new slot"""
         # Simple heuristic: check if day and time match
@@ -219,13 +384,84 @@ class ConstraintEngine:
         Returns:
             float: Quality score (0-100)
         """
+        digest = _digest((timetable, context))
+        return self._cached_by_key(
+            self._result_key('score', digest),
+            lambda: self._compute_quality_score(timetable, context, digest)
+        )
+    
+    def _compute_quality_score(self, timetable, context, digest=None):
+        context = {**context, '_shared': {}}
         soft_scores = []
         
         for constraint in self.soft_constraints:
             if not constraint.enabled:
                 continue
             
-            result = constraint.check(timetable, context)
+            result = self._check_soft(constraint, timetable, context, digest)
             soft_scores.append(result['score'])
         
         return sum(soft_scores) / len(soft_scores) if soft_scores else 100
+    
+    def _check_soft(self, constraint, timetable, context, digest):
+        """
+        constraint.check(), reusing its result when the same timetable (`digest`
+        is its digest with the context; None means not reusable) was already
+        soft-checked by a validation or scoring of another kind or mode.
+        """
+        if digest is None:
+            return constraint.check(timetable, context)
+        
+        with self._results_lock:
+            results = self._soft_results.get(digest)
+            if results is None:
+                results = self._soft_results[digest] = {}
+                if len(self._soft_results) > SOFT_RESULT_CACHE_SIZE:
+                    self._soft_results.popitem(last=False)
+            else:
+                self._soft_results.move_to_end(digest)
+        
+        result = results.get(constraint.name)
+        if result is None:
+            result = results[constraint.name] = constraint.check(timetable, context)
+        return result
+    
+    def _cached_by_key(self, key, compute):
+        """Return compute(), reusing the result stored under `key` (None: no caching)."""
+        if key is None:
+            return compute()
+        
+        with self._results_lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+        
+        result = compute()
+        
+        with self._results_lock:
+            self._results[key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        
+        return result
+    
+    def _result_key(self, kind, digest):
+        """Key for a result of this kind over digested inputs under the enabled constraints (None: no caching)."""
+        if digest is None:
+            return None
+        return (kind, self._disabled_names(), digest)
+    
+    def _disabled_names(self):
+        # Names of the disabled constraints; soft constraints not yet
+        # registered are all enabled, so they add nothing
+        return tuple(c.name for c in chain(self.hard_constraints, self._soft_constraints or ()) if not c.enabled)
+
+
+def _digest(value):
+    """Content digest of a JSON-serializable value, or None if it is not."""
+    try:
+        payload = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
@@ -5,7 +5,64 @@ These constraints MUST NEVER be violated. A timetable with any hard constraint
 violation is invalid and cannot be used.
 """
 
-from .base import Constraint, ConstraintViolation
+from collections import Counter, defaultdict
+
+from .base import Constraint, violation_dict, shared, fail_fast, lecture_slots, slot_column
+
+
+def time_slot_keys(timetable):
+    """(day, slot_index) of each slot, in timetable order"""
+    return [(slot['day'], slot['slot']) for slot in timetable]
+
+
+def group_by_time_slot(timetable, keys=None):
+    """
+    Group slots by (day, slot_index), in order of first appearance.
+    
+    Args:
+        timetable: List of slot dictionaries (each must have 'day' and 'slot')
+        keys: Optional time_slot_keys(timetable)
+    
+    Returns:
+        {(day, slot_index): [slots]}
+    """
+    if keys is None:
+        keys = time_slot_keys(timetable)
+    time_slots = defaultdict(list)
+    for key, slot in zip(keys, timetable):
+        time_slots[key].append(slot)
+    return dict(time_slots)
+
+
+def clashing_time_slots(keys, values, timetable):
+    """
+    The (day, slot_index) groups in which two slots share a real (not empty
+    or 'TBA') value, in order of first appearance.
+    
+    Repeated (time slot, value) pairs are counted in C, so only the groups
+    that actually hold an overlap are built; clash-free timetables build none.
+    
+    Args:
+        keys: time_slot_keys(timetable)
+        values: Each slot's teacher or room (see base.slot_column)
+        timetable: List of slot dictionaries
+    
+    Returns:
+        {(day, slot_index): [slots]}, like group_by_time_slot restricted to clashes
+    """
+    counts = Counter(zip(keys, values))
+    clashing = {key for (key, value), count in counts.items() if count > 1 and value and value != 'TBA'}
+    
+    time_slots = defaultdict(list)
+    if clashing:
+        for key, slot in zip(keys, timetable):
+            if key in clashing:
+                time_slots[key].append(slot)
+    return dict(time_slots)
+
+
+def _time_slot_keys(timetable, context):
+    return shared(context, 'time_slot_keys', lambda: time_slot_keys(timetable))
 
 
 class TeacherNonOverlapConstraint(Constraint):
@@ -21,48 +78,50 @@ class TeacherNonOverlapConstraint(Constraint):
     def check(self, timetable, context):
         violations = []
         
-        # Group slots by (day, slot_index)
-        time_slots = {}
-        for slot in timetable:
-            key = (slot['day'], slot['slot'])
-            if key not in time_slots:
-                time_slots[key] = []
-            time_slots[key].append(slot)
-        
-        # Check each time slot for teacher overlaps
-        for (day, slot_index), slots in time_slots.items():
-            teacher_assignments = {}
-            
-            for slot in slots:
-                teacher = slot.get('teacher')
-                if not teacher or teacher == 'TBA':
-                    continue
-                
-                if teacher not in teacher_assignments:
-                    teacher_assignments[teacher] = []
-                teacher_assignments[teacher].append(slot)
-            
-            # Report violations
-            for teacher, assigned_slots in teacher_assignments.items():
-                if len(assigned_slots) > 1:
-                    divisions = [f"{s['year']}-{s['division']}" for s in assigned_slots]
-                    violations.append(ConstraintViolation(
-                        message=f"Teacher '{teacher}' is assigned to multiple divisions at the same time",
-                        entities={
-                            "teacher": teacher,
-                            "divisions": divisions,
-                            "day": day,
-                            "time_slot": slot_index
-                        },
-                        slot=f"{day} Slot {slot_index}",
-                        severity="HARD"
-                    ))
+        # Check each time slot holding a teacher overlap
+        clashes = clashing_time_slots(
+            _time_slot_keys(timetable, context), slot_column(timetable, context, 'teacher'), timetable
+        )
+        for (day, slot_index), slots in clashes.items():
+            violations.extend(self.check_time_slot(day, slot_index, slots))
+            if violations and fail_fast(context):
+                break
         
         return {
             "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": None
         }
+    
+    def check_time_slot(self, day, slot_index, slots):
+        """Violations (as dicts) among the slots sharing one (day, slot_index)"""
+        violations = []
+        teacher_assignments = defaultdict(list)
+        
+        for slot in slots:
+            teacher = slot.get('teacher')
+            if not teacher or teacher == 'TBA':
+                continue
+            
+            teacher_assignments[teacher].append(slot)
+        
+        # Report violations
+        for teacher, assigned_slots in teacher_assignments.items():
+            if len(assigned_slots) > 1:
+                divisions = [f"{s['year']}-{s['division']}" for s in assigned_slots]
+                violations.append(violation_dict(
+                    message=f"Teacher '{teacher}' is assigned to multiple divisions at the same time",
+                    entities={
+                        "teacher": teacher,
+                        "divisions": divisions,
+                        "day": day,
+                        "time_slot": slot_index
+                    },
+                    slot=f"{day} Slot {slot_index}",
+                    severity="HARD"
+                ))
+        
+        return violations
 
 
 class RoomNonOverlapConstraint(Constraint):
@@ -78,48 +137,50 @@ class RoomNonOverlapConstraint(Constraint):
     def check(self, timetable, context):
         violations = []
         
-        # Group slots by (day, slot_index)
-        time_slots = {}
-        for slot in timetable:
-            key = (slot['day'], slot['slot'])
-            if key not in time_slots:
-                time_slots[key] = []
-            time_slots[key].append(slot)
-        
-        # Check each time slot for room overlaps
-        for (day, slot_index), slots in time_slots.items():
-            room_assignments = {}
-            
-            for slot in slots:
-                room = slot.get('room')
-                if not room or room == 'TBA':
-                    continue
-                
-                if room not in room_assignments:
-                    room_assignments[room] = []
-                room_assignments[room].append(slot)
-            
-            # Report violations
-            for room, assigned_slots in room_assignments.items():
-                if len(assigned_slots) > 1:
-                    divisions = [f"{s['year']}-{s['division']}" for s in assigned_slots]
-                    violations.append(ConstraintViolation(
-                        message=f"Room '{room}' is booked for multiple divisions at the same time",
-                        entities={
-                            "room": room,
-                            "divisions": divisions,
-                            "day": day,
-                            "time_slot": slot_index
-                        },
-                        slot=f"{day} Slot {slot_index}",
-                        severity="HARD"
-                    ))
+        # Check each time slot holding a room overlap
+        clashes = clashing_time_slots(
+            _time_slot_keys(timetable, context), slot_column(timetable, context, 'room'), timetable
+        )
+        for (day, slot_index), slots in clashes.items():
+            violations.extend(self.check_time_slot(day, slot_index, slots))
+            if violations and fail_fast(context):
+                break
         
         return {
             "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": None
         }
+    
+    def check_time_slot(self, day, slot_index, slots):
+        """Violations (as dicts) among the slots sharing one (day, slot_index)"""
+        violations = []
+        room_assignments = defaultdict(list)
+        
+        for slot in slots:
+            room = slot.get('room')
+            if not room or room == 'TBA':
+                continue
+            
+            room_assignments[room].append(slot)
+        
+        # Report violations
+        for room, assigned_slots in room_assignments.items():
+            if len(assigned_slots) > 1:
+                divisions = [f"{s['year']}-{s['division']}" for s in assigned_slots]
+                violations.append(violation_dict(
+                    message=f"Room '{room}' is booked for multiple divisions at the same time",
+                    entities={
+                        "room": room,
+                        "divisions": divisions,
+                        "day": day,
+                        "time_slot": slot_index
+                    },
+                    slot=f"{day} Slot {slot_index}",
+                    severity="HARD"
+                ))
+        
+        return violations
 
 
 class PracticalBatchSyncConstraint(Constraint):
@@ -133,8 +194,6 @@ class PracticalBatchSyncConstraint(Constraint):
         )
     
     def check(self, timetable, context):
-        violations = []
-        
         # HC3: All batches of a division must have practicals at the same time
         # NOTE: This original constraint enforced that all batches do the SAME subject or start at same time.
         # With the new rule 11 ("Each sub-batch must be assigned a different lab subject"), 
@@ -148,19 +207,7 @@ class PracticalBatchSyncConstraint(Constraint):
         # We could implement "Synchronization Check" later: 
         # "If Year-Div has a lab in Slot X, ALL batches must have a lab in Slot X."
         
-        pass
-        
-        return {
-            "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
-            "score": None
-        }
-        
-        return {
-            "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
-            "score": None
-        }
+        return {"valid": True, "violations": [], "score": None}
 
 
 class WeeklyLectureCompletionConstraint(Constraint):
@@ -197,16 +244,14 @@ class WeeklyLectureCompletionConstraint(Constraint):
                 
             required_lectures[key] = req
         
-        # Count actual lectures in timetable
-        actual_lectures = {}
-        for slot in timetable:
-            if slot.get('type') == 'Practical' or slot.get('subject') == 'Free':
-                continue  # Don't count practicals or free slots as lectures
-            
-            key = (slot.get('subject'), slot.get('year'), slot.get('division'))
-            if key not in actual_lectures:
-                actual_lectures[key] = 0
-            actual_lectures[key] += 1
+        # Count actual lectures in timetable (not practicals or free slots),
+        # filtering in one generator that Counter consumes at C level
+        actual_lectures = Counter(
+            (subject, slot.get('year'), slot.get('division'))
+            for slot in lecture_slots(timetable, context)
+            for subject in (slot.get('subject'),)
+            if subject != 'Free'
+        )
         
         # Check for mismatches
         all_keys = set(required_lectures.keys()) | set(actual_lectures.keys())
@@ -222,7 +267,7 @@ class WeeklyLectureCompletionConstraint(Constraint):
                 else:
                     message = f"Subject '{subject}' for {year}-{division} has {actual}/{required} lectures (over-allocated)"
                 
-                violations.append(ConstraintViolation(
+                violations.append(violation_dict(
                     message=message,
                     entities={
                         "subject": subject,
@@ -235,10 +280,12 @@ class WeeklyLectureCompletionConstraint(Constraint):
                     slot="Weekly allocation",
                     severity="HARD"
                 ))
+                if fail_fast(context):
+                    break
         
         return {
             "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": None
         }
 
@@ -246,6 +293,15 @@ class WeeklyLectureCompletionConstraint(Constraint):
 class StructuralValidityConstraint(Constraint):
     """HC5: All referenced entities must exist in branch/smart input data"""
     
+    # (valid_entities() key, slot field, values accepted without a reference)
+    COLUMNS = (
+        ("years", 'year', ()),
+        ("divisions", 'division', ()),
+        ("subjects", 'subject', ('Unassigned', 'Free')),
+        ("teachers", 'teacher', ('TBA',)),
+        ("rooms", 'room', ('TBA',))
+    )
+    
     def __init__(self):
         super().__init__(
             name="STRUCTURAL_VALIDITY",
@@ -255,8 +311,28 @@ class StructuralValidityConstraint(Constraint):
     
     def check(self, timetable, context):
         violations = []
+        valid = self.valid_entities(context)
+        
+        # Most timetables only reference valid entities; checking each
+        # column's distinct values shows that without visiting every slot
+        if not self.invalid_values(timetable, context, valid):
+            return {"valid": True, "violations": [], "score": None}
+        
+        # Validate each slot
+        stop_at_first = fail_fast(context)
+        for slot in timetable:
+            violations.extend(self.check_slot(slot, valid))
+            if violations and stop_at_first:
+                break
         
-        # Extract valid entities from context
+        return {
+            "valid": len(violations) == 0,
+            "violations": violations,
+            "score": None
+        }
+    
+    def valid_entities(self, context):
+        """Sets of valid years, divisions, subjects, teachers and rooms (incl. labs)"""
         branch_data = context.get('branchData', {})
         smart_input = context.get('smartInputData', {})
         
@@ -280,62 +356,73 @@ class StructuralValidityConstraint(Constraint):
             
         valid_rooms.update(valid_labs)
         
-        # Validate each slot
-        for slot in timetable:
-            slot_ref = f"{slot.get('day')} Slot {slot.get('slot')} ({slot.get('year')}-{slot.get('division')})"
-            
-            # Check year
-            year = slot.get('year')
-            if year and year not in valid_years:
-                violations.append(ConstraintViolation(
-                    message=f"Invalid year '{year}' referenced in timetable",
-                    entities={"year": year, "valid_years": list(valid_years)},
-                    slot=slot_ref,
-                    severity="HARD"
-                ))
-            
-            # Check division
-            division = slot.get('division')
-            if division and division not in valid_divisions:
-                violations.append(ConstraintViolation(
-                    message=f"Invalid division '{division}' referenced in timetable",
-                    entities={"division": division, "valid_divisions": list(valid_divisions)},
-                    slot=slot_ref,
-                    severity="HARD"
-                ))
-            
-            # Check subject
-            subject = slot.get('subject')
-            if subject and subject not in ['Unassigned', 'Free'] and subject not in valid_subjects:
-                violations.append(ConstraintViolation(
-                    message=f"Invalid subject '{subject}' referenced in timetable",
-                    entities={"subject": subject},
-                    slot=slot_ref,
-                    severity="HARD"
-                ))
-            
-            # Check teacher
-            teacher = slot.get('teacher')
-            if teacher and teacher != 'TBA' and teacher not in valid_teachers:
-                violations.append(ConstraintViolation(
-                    message=f"Invalid teacher '{teacher}' referenced in timetable",
-                    entities={"teacher": teacher},
-                    slot=slot_ref,
-                    severity="HARD"
-                ))
-            
-            # Check room
-            room = slot.get('room')
-            if room and room != 'TBA' and room not in valid_rooms:
-                violations.append(ConstraintViolation(
-                    message=f"Invalid room '{room}' referenced in timetable",
-                    entities={"room": room},
-                    slot=slot_ref,
-                    severity="HARD"
-                ))
-        
         return {
-            "valid": len(violations) == 0,
-            "violations": [v.to_dict() for v in violations],
-            "score": None
+            "years": valid_years,
+            "divisions": valid_divisions,
+            "subjects": valid_subjects,
+            "teachers": valid_teachers,
+            "rooms": valid_rooms
         }
+    
+    def invalid_values(self, timetable, context, valid):
+        """
+        Whether any slot holds a value check_slot would reject, judged from the
+        distinct values of each column rather than slot by slot.
+        """
+        for kind, field, exempt in self.COLUMNS:
+            for value in set(slot_column(timetable, context, field)) - valid[kind]:
+                if value and value not in exempt:
+                    return True
+        return False
+    
+    def check_slot(self, slot, valid):
+        """Violations (as dicts) for one slot against valid_entities()"""
+        valid_years = valid['years']
+        valid_divisions = valid['divisions']
+        valid_subjects = valid['subjects']
+        valid_teachers = valid['teachers']
+        valid_rooms = valid['rooms']
+        
+        # (message, entities) per problem; most slots have none, so the
+        # reference string is only built for those that do
+        problems = []
+        
+        # Check year
+        year = slot.get('year')
+        if year and year not in valid_years:
+            problems.append((f"Invalid year '{year}' referenced in timetable",
+                             {"year": year, "valid_years": list(valid_years)}))
+        
+        # Check division
+        division = slot.get('division')
+        if division and division not in valid_divisions:
+            problems.append((f"Invalid division '{division}' referenced in timetable",
+                             {"division": division, "valid_divisions": list(valid_divisions)}))
+        
+        # Check subject
+        subject = slot.get('subject')
+        if subject and subject not in ['Unassigned', 'Free'] and subject not in valid_subjects:
+            problems.append((f"Invalid subject '{subject}' referenced in timetable",
+                             {"subject": subject}))
+        
+        # Check teacher
+        teacher = slot.get('teacher')
+        if teacher and teacher != 'TBA' and teacher not in valid_teachers:
+            problems.append((f"Invalid teacher '{teacher}' referenced in timetable",
+                             {"teacher": teacher}))
+        
+        # Check room
+        room = slot.get('room')
+        if room and room != 'TBA' and room not in valid_rooms:
+            problems.append((f"Invalid room '{room}' referenced in timetable",
+                             {"room": room}))
+        
+        if not problems:
+            return []
+        
+        slot_ref = f"{slot.get('day')} Slot {slot.get('slot')} ({year}-{division})"
+        return [
+            violation_dict(message, entities, slot_ref, "HARD")
+            for message, entities in problems
+        ]
+
@@ -5,10 +5,74 @@ These constraints represent optimization goals. They don't invalidate a timetabl
 but affect its quality score. Higher scores indicate better timetables.
 """
 
-from .base import Constraint, ConstraintViolation
-import statistics
+from .base import Constraint, violation_dict, shared, lecture_slots, slot_column
+from collections import Counter, defaultdict
+from operator import itemgetter
+import math
 
 
+def load_counts(timetable, lectures=None):
+    """
+    Daily load counts used by the balance and repetition constraints.
+    
+    Args:
+        timetable: List of slot dictionaries
+        lectures: Optional non-practical slots of the timetable (see lecture_slots)
+    
+    Returns:
+        {
+            "teacher_daily": {(teacher, day): lectures},  # excluding practicals and TBA
+            "division_daily": {(year, division, day): slots},
+            "subject_daily": {(day, year, division, subject): lectures}  # excluding practicals
+        }
+    """
+    # One Counter per index, each filled from a generator at C level
+    if lectures is None:
+        lectures = [slot for slot in timetable if slot.get('type') != 'Practical']
+    division_daily = Counter(
+        (slot.get('year'), slot.get('division'), slot.get('day')) for slot in timetable
+    )
+    teacher_daily = Counter(
+        (teacher, slot.get('day'))
+        for slot in lectures
+        for teacher in (slot.get('teacher'),)
+        if teacher and teacher != 'TBA'
+    )
+    subject_daily = Counter(
+        (slot.get('day'), slot.get('year'), slot.get('division'), slot.get('subject')) for slot in lectures
+    )
+    
+    return {
+        "teacher_daily": teacher_daily,
+        "division_daily": division_daily,
+        "subject_daily": subject_daily
+    }
+
+
+def count_stats(counts):
+    """
+    (mean, sample standard deviation) of int counts, from exact integer sums
+    rather than statistics' Fraction arithmetic: the mean is statistics.mean's
+    (an int when it divides evenly, else the correctly rounded float), the
+    deviation 0 for fewer than two counts.
+    """
+    n = len(counts)
+    total = sum(counts)
+    mean = total // n if total % n == 0 else total / n
+    if n < 2:
+        return mean, 0
+    squares = sum(count * count for count in counts)
+    return mean, math.sqrt((n * squares - total * total) / (n * (n - 1)))
+
+
+def _load_counts(timetable, context):
+    return shared(context, 'load_counts', lambda: load_counts(timetable, lecture_slots(timetable, context)))
+
+
+def _day_slot_order(timetable, context):
+    # Stable, so grouping it keeps each group sorted by (day, slot) in timetable order
+    return shared(context, 'day_slot_order', lambda: sorted(timetable, key=itemgetter('day', 'slot')))
+
 
 class ConsecutiveLectureConstraint(Constraint):
     """SC_New1: A teacher should not have more than 2 consecutive lectures."""
@@ -21,39 +85,39 @@ class ConsecutiveLectureConstraint(Constraint):
     
     def check(self, timetable, context):
         violations = []
-        teacher_slots = {}
-        for slot in timetable:
+        # Teachers in order of first appearance, each with its slots in (day, slot) order
+        teacher_slots = {t: [] for t in dict.fromkeys(slot_column(timetable, context, 'teacher')) if t and t != 'TBA'}
+        for slot in _day_slot_order(timetable, context):
             t = slot.get('teacher')
-            if not t or t == 'TBA': continue
-            if t not in teacher_slots: teacher_slots[t] = []
-            teacher_slots[t].append(slot)
+            if t in teacher_slots: teacher_slots[t].append(slot)
             
         for teacher, slots in teacher_slots.items():
-            slots.sort(key=lambda x: (x['day'], x['slot']))
             consecutive = 0
             last_day = None
             last_slot = -2
             
             for s in slots:
-                if s['day'] == last_day and s['slot'] == last_slot + 1:
+                day = s['day']
+                slot_index = s['slot']
+                if day == last_day and slot_index == last_slot + 1:
                     consecutive += 1
                 else:
                     consecutive = 1
                 
-                last_day = s['day']
-                last_slot = s['slot']
+                last_day = day
+                last_slot = slot_index
                 
                 if consecutive > 2:
-                     violations.append(ConstraintViolation(
+                     violations.append(violation_dict(
                         message=f"Teacher '{teacher}' has >2 consecutive lectures",
                         entities={"teacher": teacher},
-                        slot=f"{s['day']} Slot {s['slot']}",
+                        slot=f"{day} Slot {slot_index}",
                         severity="SOFT"
                     ))
         
         return {
             "valid": True, 
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": max(0, 100 - (5 * len(violations))) # Simple score logic
         }
 
@@ -68,38 +132,39 @@ class StudentConsecutiveConstraint(Constraint):
     
     def check(self, timetable, context):
         violations = []
-        div_slots = {}
-        for slot in timetable:
-            key = (slot['year'], slot['division'])
-            if key not in div_slots: div_slots[key] = []
-            div_slots[key].append(slot)
+        # Divisions in order of first appearance, each with its slots in (day, slot) order
+        division_of = itemgetter('year', 'division')
+        div_slots = {key: [] for key in dict.fromkeys(map(division_of, timetable))}
+        for slot in _day_slot_order(timetable, context):
+            div_slots[division_of(slot)].append(slot)
             
         for (year, div), slots in div_slots.items():
-            slots.sort(key=lambda x: (x['day'], x['slot']))
             consecutive = 0
             last_day = None
             last_slot = -2
             
             for s in slots:
-                if s['day'] == last_day and s['slot'] == last_slot + 1:
+                day = s['day']
+                slot_index = s['slot']
+                if day == last_day and slot_index == last_slot + 1:
                     consecutive += 1
                 else:
                     consecutive = 1
                 
-                last_day = s['day']
-                last_slot = s['slot']
+                last_day = day
+                last_slot = slot_index
                 
                 if consecutive > 3:
-                     violations.append(ConstraintViolation(
+                     violations.append(violation_dict(
                         message=f"{year}-{div} has >3 continuous lectures",
                         entities={"year": year, "division": div},
-                        slot=f"{s['day']} Slot {s['slot']}",
+                        slot=f"{day} Slot {slot_index}",
                         severity="SOFT"
                     ))
         
         return {
             "valid": True,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": max(0, 100 - (2 * len(violations)))
         }
 
@@ -116,36 +181,14 @@ class BalancedTeacherLoadConstraint(Constraint):
     def check(self, timetable, context):
         violations = []
         
-        # Count lectures per teacher per day
-        teacher_daily_load = {}
-        for slot in timetable:
-            if slot.get('type') == 'Practical':
-                continue  # Don't count practicals
-            
-            teacher = slot.get('teacher')
-            day = slot.get('day')
-            
-            if not teacher or teacher == 'TBA':
-                continue
-            
-            key = (teacher, day)
-            if key not in teacher_daily_load:
-                teacher_daily_load[key] = 0
-            teacher_daily_load[key] += 1
+        # Count lectures per teacher per day (practicals are not counted)
+        teacher_daily_load = _load_counts(timetable, context)['teacher_daily']
         
-        # Calculate variance
+        # Calculate spread
         if len(teacher_daily_load) == 0:
             return {"valid": True, "violations": [], "score": 100}
         
-        loads = list(teacher_daily_load.values())
-        mean_load = statistics.mean(loads)
-        
-        if len(loads) > 1:
-            variance = statistics.variance(loads)
-            std_dev = statistics.stdev(loads)
-        else:
-            variance = 0
-            std_dev = 0
+        mean_load, std_dev = count_stats(teacher_daily_load.values())
         
         # Score based on standard deviation (lower is better)
         # Normalize: perfect score if std_dev = 0, lower score as std_dev increases
@@ -153,10 +196,12 @@ class BalancedTeacherLoadConstraint(Constraint):
         score = max(0, 100 - (std_dev / max_acceptable_std_dev) * 100)
         
         # Report violations for teachers with significantly high load
+        threshold = mean_load + std_dev
+        average = f"{mean_load:.1f}"
         for (teacher, day), load in teacher_daily_load.items():
-            if load > mean_load + std_dev:
-                violations.append(ConstraintViolation(
-                    message=f"Teacher '{teacher}' has {load} lectures on {day} (above average: {mean_load:.1f})",
+            if load > threshold:
+                violations.append(violation_dict(
+                    message=f"Teacher '{teacher}' has {load} lectures on {day} (above average: {average})",
                     entities={"teacher": teacher, "day": day, "load": load, "average": mean_load},
                     slot=day,
                     severity="SOFT"
@@ -164,7 +209,7 @@ class BalancedTeacherLoadConstraint(Constraint):
         
         return {
             "valid": True,  # Soft constraints don't invalidate
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": round(score, 2)
         }
 
@@ -183,23 +228,18 @@ class BalancedDailyLoadConstraint(Constraint):
         violations = []
         
         # Count lectures per day per division
-        division_daily_load = {}
-        for slot in timetable:
-            key = (slot.get('year'), slot.get('division'), slot.get('day'))
-            if key not in division_daily_load:
-                division_daily_load[key] = 0
-            division_daily_load[key] += 1
+        division_daily_load = _load_counts(timetable, context)['division_daily']
         
         if len(division_daily_load) == 0:
             return {"valid": True, "violations": [], "score": 100}
         
         # Group by division, analyze distribution
-        division_loads = {}
+        division_loads = defaultdict(list)
+        division_days = defaultdict(list)
         for (year, division, day), count in division_daily_load.items():
             div_key = (year, division)
-            if div_key not in division_loads:
-                division_loads[div_key] = []
             division_loads[div_key].append(count)
+            division_days[div_key].append(day)
         
         total_score = 0
         num_divisions = len(division_loads)
@@ -209,8 +249,7 @@ class BalancedDailyLoadConstraint(Constraint):
                 total_score += 100
                 continue
             
-            mean_load = statistics.mean(daily_counts)
-            std_dev = statistics.stdev(daily_counts)
+            mean_load, std_dev = count_stats(daily_counts)
             
             # Score based on std deviation
             max_acceptable_std_dev = 2.0
@@ -218,9 +257,10 @@ class BalancedDailyLoadConstraint(Constraint):
             total_score += div_score
             
             # Report days with high load
-            for (y, d, day), count in division_daily_load.items():
-                if y == year and d == division and count > mean_load + std_dev:
-                    violations.append(ConstraintViolation(
+            threshold = mean_load + std_dev
+            for day, count in zip(division_days[(year, division)], daily_counts):
+                if count > threshold:
+                    violations.append(violation_dict(
                         message=f"{year}-{division} has {count} lectures on {day} (above average: {mean_load:.1f})",
                         entities={"year": year, "division": division, "day": day, "load": count, "average": mean_load},
                         slot=day,
@@ -231,7 +271,7 @@ class BalancedDailyLoadConstraint(Constraint):
         
         return {
             "valid": True,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": round(score, 2)
         }
 
@@ -249,16 +289,8 @@ class SubjectRepetitionConstraint(Constraint):
     def check(self, timetable, context):
         violations = []
         
-        # Group by (day, year, division, subject)
-        daily_subject_count = {}
-        for slot in timetable:
-            if slot.get('type') == 'Practical':
-                continue  # Don't penalize practical repetitions
-            
-            key = (slot.get('day'), slot.get('year'), slot.get('division'), slot.get('subject'))
-            if key not in daily_subject_count:
-                daily_subject_count[key] = 0
-            daily_subject_count[key] += 1
+        # Group by (day, year, division, subject); practical repetitions aren't penalized
+        daily_subject_count = _load_counts(timetable, context)['subject_daily']
         
         # Find repetitions
         repetitions = 0
@@ -267,7 +299,7 @@ class SubjectRepetitionConstraint(Constraint):
         for (day, year, division, subject), count in daily_subject_count.items():
             if count > 1:
                 repetitions += count - 1  # Each extra occurrence is a penalty
-                violations.append(ConstraintViolation(
+                violations.append(violation_dict(
                     message=f"{subject} appears {count} times on {day} for {year}-{division}",
                     entities={"subject": subject, "day": day, "year": year, "division": division, "count": count},
                     slot=day,
@@ -284,11 +316,19 @@ class SubjectRepetitionConstraint(Constraint):
         
         return {
             "valid": True,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": round(score, 2)
         }
 
 
+def _slot_set(slots):
+    """Slot indices as a set for membership tests, or as given if unhashable"""
+    try:
+        return set(slots)
+    except TypeError:
+        return slots
+
+
 class PreferenceConstraint(Constraint):
     """SC4: Respect teacher and subject preferences (optional)"""
     
@@ -314,20 +354,26 @@ class PreferenceConstraint(Constraint):
         satisfied_preferences = 0
         total_preferences = 0
         
+        # Example preference structure: {"preferredSlots": [0, 1, 2], "avoidSlots": [6, 7]},
+        # turned into sets once per teacher rather than scanned per slot
+        preferred_slots = {}
+        avoid_slots = {}
+        for teacher, pref in teacher_preferences.items():
+            preferred_slots[teacher] = _slot_set(pref.get('preferredSlots', ()))
+            avoid_slots[teacher] = _slot_set(pref.get('avoidSlots', ()))
+        
         # Check teacher preferences
         for slot in timetable:
             teacher = slot.get('teacher')
             slot_time = slot.get('slot')  # 0-based slot index
             
             if teacher in teacher_preferences:
-                pref = teacher_preferences[teacher]
                 total_preferences += 1
                 
-                # Example preference structure: {"preferredSlots": [0, 1, 2], "avoidSlots": [6, 7]}
-                if 'preferredSlots' in pref and slot_time in pref['preferredSlots']:
+                if slot_time in preferred_slots[teacher]:
                     satisfied_preferences += 1
-                elif 'avoidSlots' in pref and slot_time in pref['avoidSlots']:
-                    violations.append(ConstraintViolation(
+                elif slot_time in avoid_slots[teacher]:
+                    violations.append(violation_dict(
                         message=f"Teacher '{teacher}' prefers to avoid slot {slot_time}",
                         entities={"teacher": teacher, "slot": slot_time},
                         slot=f"{slot.get('day')} Slot {slot_time}",
@@ -344,6 +390,6 @@ class PreferenceConstraint(Constraint):
         
         return {
             "valid": True,
-            "violations": [v.to_dict() for v in violations],
+            "violations": violations,
             "score": round(score, 2)
         }
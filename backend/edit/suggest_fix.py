@@ -4,7 +4,7 @@ Auto-Fix Suggestions
 Generates intelligent fix suggestions for conflicts.
 """
 
-from constraints.constraint_engine import ConstraintEngine
+from .validate_edit import engine
 
 
 def suggest_fix(slot, conflicts, timetable, context):
@@ -66,6 +66,9 @@ def find_alternate_teacher(slot, timetable, context):
     day = slot.get('day')
     slot_index = slot.get('slot')
     
+    # Teachers already teaching at this time, found in one pass
+    busy_teachers = _busy_at(timetable, 'teacher', day, slot_index)
+    
     # Find teachers who can teach this subject
     qualified_teachers = []
     
@@ -76,7 +79,7 @@ def find_alternate_teacher(slot, timetable, context):
         # Check if teacher can teach subject
         if not teacher_subjects or subject in teacher_subjects:
             # Check if teacher is available at this time
-            if _is_teacher_available(teacher_name, day, slot_index, timetable):
+            if teacher_name not in busy_teachers:
                 qualified_teachers.append(teacher_name)
     
     return qualified_teachers
@@ -100,11 +103,14 @@ def find_alternate_room(slot, timetable, context):
     else:
         rooms = branch_data.get('rooms', [])
     
+    # Rooms already booked at this time, found in one pass
+    busy_rooms = _busy_at(timetable, 'room', day, slot_index)
+    
     # Find available rooms
     available_rooms = []
     
     for room in rooms:
-        if _is_room_available(room, day, slot_index, timetable):
+        if room not in busy_rooms:
             available_rooms.append(room)
     
     return available_rooms
@@ -120,13 +126,12 @@ def _try_alternate_teacher(slot, timetable, context):
         fixed_slot = {**slot, 'teacher': new_teacher}
         
         # Validate the fix
-        engine = ConstraintEngine()
         temp_timetable = [
             fixed_slot if s.get('id') == slot.get('id') else s
             for s in timetable
         ]
         
-        validation = engine.validate_timetable(temp_timetable, context)
+        validation = engine.validate_timetable(temp_timetable, context, mode='fast')
         
         if validation['valid']:
             return {
@@ -152,13 +157,12 @@ def _try_alternate_room(slot, timetable, context):
         fixed_slot = {**slot, 'room': new_room}
         
         # Validate the fix
-        engine = ConstraintEngine()
         temp_timetable = [
             fixed_slot if s.get('id') == slot.get('id') else s
             for s in timetable
         ]
         
-        validation = engine.validate_timetable(temp_timetable, context)
+        validation = engine.validate_timetable(temp_timetable, context, mode='fast')
         
         if validation['valid']:
             return {
@@ -174,21 +178,9 @@ def _try_alternate_room(slot, timetable, context):
     }
 
 
-def _is_teacher_available(teacher, day, slot_index, timetable):
-    """Check if teacher is free at given time"""
-    for slot in timetable:
-        if (slot.get('teacher') == teacher and
-            slot.get('day') == day and
-            slot.get('slot') == slot_index):
-            return False
-    return True
-
-
-def _is_room_available(room, day, slot_index, timetable):
-    """Check if room is free at given time"""
-    for slot in timetable:
-        if (slot.get('room') == room and
-            slot.get('day') == day and
-            slot.get('slot') == slot_index):
-            return False
-    return True
+def _busy_at(timetable, field, day, slot_index):
+    """Values of slot[field] (teachers or rooms) taken at the given time"""
+    return {
+        slot.get(field) for slot in timetable
+        if slot.get('day') == day and slot.get('slot') == slot_index
+    }
@@ -6,6 +6,11 @@ Validates individual slot edits and timetable changes.
 
 from constraints.constraint_engine import ConstraintEngine
 
+# Shared by every edit validation (and suggest_fix): an editing session
+# re-validates the same edited timetable several times (check the edit,
+# try fixes, save), which the engine's memoized results then answer
+engine = ConstraintEngine()
+
 
 def validate_slot_edit(modified_slot, full_timetable, context):
     """
@@ -24,8 +29,6 @@ def validate_slot_edit(modified_slot, full_timetable, context):
             "severity": "HARD" | "SOFT" | "NONE"
         }
     """
-    engine = ConstraintEngine()
-    
     # Create temporary timetable with modification
     temp_timetable = []
     for slot in full_timetable:
@@ -76,7 +79,6 @@ def validate_timetable_changes(timetable, context):
             "canSave": bool
         }
     """
-    engine = ConstraintEngine()
     result = engine.validate_timetable(timetable, context)
     
     return {
@@ -89,20 +91,19 @@ def validate_timetable_changes(timetable, context):
 
 def _filter_relevant_conflicts(all_conflicts, edited_slot):
     """Filter conflicts that involve the edited slot"""
+    day, slot = edited_slot.get('day'), edited_slot.get('slot')
+    teacher, room = edited_slot.get('teacher'), edited_slot.get('room')
     relevant = []
     
     for conflict in all_conflicts:
-        # Check if conflict involves this slot
-        affected_entities = conflict.get('affectedEntities', {})
-        
         # Check if day/slot/year/division match
-        if (conflict.get('day') == edited_slot.get('day') and
-            conflict.get('slot') == edited_slot.get('slot')):
+        if conflict.get('day') == day and conflict.get('slot') == slot:
             relevant.append(conflict)
+            continue
         
         # Check if teacher/room match
-        elif (affected_entities.get('teacher') == edited_slot.get('teacher') or
-              affected_entities.get('room') == edited_slot.get('room')):
+        affected_entities = conflict.get('affectedEntities', {})
+        if affected_entities.get('teacher') == teacher or affected_entities.get('room') == room:
             relevant.append(conflict)
     
     return relevant
@@ -5,6 +5,8 @@ Generates valid candidate assignments for each slot using smart filtering
 and constraint-aware logic.
 """
 
+from operator import itemgetter
+
 
 class CandidateGenerator:
     """Generates candidate assignments for timetable slots"""
@@ -21,6 +23,81 @@ class CandidateGenerator:
         self.context = context
         self.branch_data = context.get('branchData', {})
         self.smart_input = context.get('smartInputData', {})
+        
+        # Subjects, teachers and classrooms depend only on the context, so
+        # they are resolved once rather than on every slot
+        self._subject_teachers = {}
+        self._year_rooms = {}
+        self._explicit_teachers = self._map_teachers_to_subjects()
+        self._subjects_by_class = self._group_subjects_by_class()
+    
+    def _map_teachers_to_subjects(self):
+        """Map subject names to teachers from the explicit teacher-subject map"""
+        tm_map = {}
+        for entry in self.smart_input.get('teacherSubjectMap', []):
+            s_name = entry.get('subjectName')
+            t_name = entry.get('teacherName')
+            if s_name and t_name:
+                if s_name not in tm_map: tm_map[s_name] = []
+                tm_map[s_name].append(t_name)
+        return tm_map
+    
+    def _group_subjects_by_class(self):
+        """Group subject definitions by (year, division), keeping their input order"""
+        subjects_by_class = {}
+        for subject_data in self.smart_input.get('subjects', []):
+            class_key = (subject_data.get('year'), subject_data.get('division'))
+            if class_key not in subjects_by_class: subjects_by_class[class_key] = []
+            subjects_by_class[class_key].append(subject_data)
+        return subjects_by_class
+    
+    def _teachers_for_subject(self, subject_name):
+        """Get the teacher names that can take lectures of a subject"""
+        if subject_name in self._subject_teachers:
+            return self._subject_teachers[subject_name]
+        
+        # 1. Use explicit map if exists for this subject
+        if subject_name in self._explicit_teachers:
+            valid_teacher_names = self._explicit_teachers[subject_name]
+        else:
+            # 2. Use general competence list
+            valid_teacher_names = []
+            for t in self.smart_input.get('teachers', []):
+                t_subs = t.get('subjects', [])
+                if subject_name in t_subs:
+                    valid_teacher_names.append(t.get('name'))
+        
+        self._subject_teachers[subject_name] = valid_teacher_names
+        return valid_teacher_names
+    
+    def _classrooms_for_year(self, year):
+        """Get the rooms lectures of a year can be held in"""
+        if year in self._year_rooms:
+            return self._year_rooms[year]
+        
+        # Find valid CLASSROOMS (Rule 22: Classrooms only for theory)
+        # branch_data['classrooms'] might be a Dict { "SE": ["Room1"] } or List.
+        # Let's handle both.
+        classrooms_config = self.branch_data.get('classrooms', {})
+        valid_rooms = []
+        
+        if isinstance(classrooms_config, dict):
+             valid_rooms = classrooms_config.get(year, [])
+        elif isinstance(classrooms_config, list):
+             valid_rooms = classrooms_config
+        
+        # If no specific classrooms found, try `rooms` but filter against `labs`
+        if not valid_rooms:
+            all_rooms = self.branch_data.get('rooms', [])
+            # Exclude shared labs
+            shared_labs = [l.get('name') for l in self.branch_data.get('sharedLabs', [])]
+            legacy_labs = self.branch_data.get('labs', [])
+            
+            forbidden = set(shared_labs + legacy_labs)
+            valid_rooms = [r for r in all_rooms if r not in forbidden]
+        
+        self._year_rooms[year] = valid_rooms
+        return valid_rooms
     
     def generate_candidates(self, slot_info):
         """
@@ -44,7 +121,7 @@ class CandidateGenerator:
         
         # Combine and sort by score
         all_candidates = practical_candidates + lecture_candidates
-        all_candidates.sort(key=lambda x: x.get('score', 0))
+        all_candidates.sort(key=itemgetter('score'))
         
         # Always add a "Free" slot candidate as the last resort
         # This allows the scheduler to leave a slot empty if necessary
@@ -73,24 +150,12 @@ class CandidateGenerator:
         division = slot_info['division']
         
         # Get subjects for this year/division
-        subjects = self.smart_input.get('subjects', [])
+        subjects = self._subjects_by_class.get((year, division), [])
         
-        # Get explicit teacher map
-        teacher_subject_map = self.smart_input.get('teacherSubjectMap', [])
-        # Map: subject -> [teacher_names]
-        tm_map = {}
-        for entry in teacher_subject_map:
-            s_name = entry.get('subjectName')
-            t_name = entry.get('teacherName')
-            if s_name and t_name:
-                if s_name not in tm_map: tm_map[s_name] = []
-                tm_map[s_name].append(t_name)
+        # Room availability is the same for every subject and teacher of this slot
+        free_rooms = None
         
         for subject_data in subjects:
-            if (subject_data.get('year') != year or 
-                subject_data.get('division') != division):
-                continue
-            
             # Skip if practical
             if subject_data.get('isPractical') or subject_data.get('type') == 'Practical':
                 continue
@@ -102,62 +167,32 @@ class CandidateGenerator:
             if remaining <= 0:
                 continue
             
-            # Find available teachers for this subject
-            teachers = self.smart_input.get('teachers', [])
-            
             # Filter valid teachers for this subject
-            valid_teacher_names = []
-            
-            # 1. Use explicit map if exists for this subject
-            if subject_name in tm_map:
-                valid_teacher_names = tm_map[subject_name]
-            else:
-                # 2. Use general competence list
-                for t in teachers:
-                    t_subs = t.get('subjects', [])
-                    if subject_name in t_subs:
-                        valid_teacher_names.append(t.get('name'))
+            valid_teacher_names = self._teachers_for_subject(subject_name)
             
             # If no teachers found for subject, we (strictly) cannot schedule. (Rule 5)
             if not valid_teacher_names:
                 continue
-
+            
             for teacher_name in valid_teacher_names:
                 # Check if teacher is available
                 if not self.state.is_teacher_available(teacher_name, day, slot_index):
                     continue
                 
-                # Find valid CLASSROOMS (Rule 22: Classrooms only for theory)
-                # Ideally get from branch_data specific to year?
-                # branch_data['classrooms'] might be a Dict { "SE": ["Room1"] } or List.
-                # Let's handle both.
-                classrooms_config = self.branch_data.get('classrooms', {})
-                valid_rooms = []
+                if free_rooms is None:
+                    free_rooms = [
+                        room for room in self._classrooms_for_year(year)
+                        if self.state.is_room_available(room, day, slot_index)
+                    ]
+                if not free_rooms:
+                    break
                 
-                if isinstance(classrooms_config, dict):
-                     valid_rooms = classrooms_config.get(year, [])
-                     if not valid_rooms: 
-                         # Fallback to all values if year specific not found?
-                         # Or fallback to global 'rooms' list but exclude labs?
-                         pass
-                elif isinstance(classrooms_config, list):
-                     valid_rooms = classrooms_config
+                # The score does not depend on the room
+                score = self._calculate_candidate_score(
+                    subject_name, teacher_name, day, slot_index, year, division
+                )
                 
-                # If no specific classrooms found, try `rooms` but filter against `labs`
-                if not valid_rooms:
-                    all_rooms = self.branch_data.get('rooms', [])
-                    # Exclude shared labs
-                    shared_labs = [l.get('name') for l in self.branch_data.get('sharedLabs', [])]
-                    legacy_labs = self.branch_data.get('labs', [])
-                    
-                    forbidden = set(shared_labs + legacy_labs)
-                    valid_rooms = [r for r in all_rooms if r not in forbidden]
-
-                for room in valid_rooms:
-                    # Check if room is available
-                    if not self.state.is_room_available(room, day, slot_index):
-                        continue
-                    
+                for room in free_rooms:
                     # Create candidate
                     candidate = {
                         'day': day,
@@ -169,9 +204,7 @@ class CandidateGenerator:
                         'room': room,
                         'type': 'Lecture',
                         'batch': None,
-                        'score': self._calculate_candidate_score(
-                            subject_name, teacher_name, day, slot_index, year, division
-                        )
+                        'score': score
                     }
                     
                     candidates.append(candidate)
@@ -199,10 +232,7 @@ class CandidateGenerator:
         score = 0
         
         # Check teacher load for this day
-        teacher_daily_slots = sum(
-            1 for (t, d, s) in self.state.teacher_assignments.keys()
-            if t == teacher and d == day
-        )
+        teacher_daily_slots = self.state.teacher_day_slots.get((teacher, day), 0)
         # Penalize if teacher already has many slots this day
         if teacher_daily_slots >= 4:
             score += 5
@@ -210,14 +240,7 @@ class CandidateGenerator:
             score += 2
         
         # Check if same subject already appears today for this division
-        same_subject_today = any(
-            slot.get('subject') == subject and 
-            slot.get('day') == day and
-            slot.get('year') == year and
-            slot.get('division') == division
-            for slot in self.state.slots
-        )
-        if same_subject_today:
+        if self.state.has_subject_on_day(subject, year, division, day):
             score += 3  # Penalize subject repetition
         
         # Prefer morning slots for practicals
@@ -56,7 +56,7 @@ class TimetableOptimizer:
             
             # Check if neighbor is valid
             validation = self.constraint_engine.validate_timetable(
-                neighbor, self.context
+                neighbor, self.context, mode='fast'
             )
             
             if not validation['valid']:
@@ -35,8 +35,10 @@ class TimetableState:
         
         # Track assignments
         self.teacher_assignments = {}  # (teacher, day, slot) -> assignment
+        self.teacher_day_slots = {}  # (teacher, day) -> number of (teacher, day, slot) keys above
         self.room_assignments = {}  # (room, day, slot) -> assignment
         self.subject_counts = {}  # (subject, year, division) -> count
+        self.subject_day_counts = {}  # (subject, year, division, day) -> number of slots
         
         # Load uploaded timetable if provided
         uploaded = context.get('uploadedTimetable', [])
@@ -133,6 +135,8 @@ class TimetableState:
         # print(f"DEBUG: Assigned Key: {slot_key}, Types: {[type(x) for x in slot_key]}", flush=True)
 
         self.slots.append(assignment)
+        subject_day = self._subject_day_key(assignment)
+        self.subject_day_counts[subject_day] = self.subject_day_counts.get(subject_day, 0) + 1
         
         # Track teacher assignment
         teacher_key = (
@@ -143,6 +147,8 @@ class TimetableState:
         if teacher_key[0]:
             if teacher_key not in self.teacher_assignments:
                 self.teacher_assignments[teacher_key] = []
+                teacher_day = teacher_key[:2]
+                self.teacher_day_slots[teacher_day] = self.teacher_day_slots.get(teacher_day, 0) + 1
             self.teacher_assignments[teacher_key].append(assignment)
         
         # Track room assignment
@@ -191,6 +197,10 @@ class TimetableState:
         # Remove from slots list
         if assignment in self.slots:
             self.slots.remove(assignment)
+            subject_day = self._subject_day_key(assignment)
+            self.subject_day_counts[subject_day] -= 1
+            if not self.subject_day_counts[subject_day]:
+                del self.subject_day_counts[subject_day]
         
         # Remove teacher assignment
         teacher_key = (
@@ -203,6 +213,10 @@ class TimetableState:
                 self.teacher_assignments[teacher_key].remove(assignment)
             if not self.teacher_assignments[teacher_key]:
                 del self.teacher_assignments[teacher_key]
+                teacher_day = teacher_key[:2]
+                self.teacher_day_slots[teacher_day] -= 1
+                if not self.teacher_day_slots[teacher_day]:
+                    del self.teacher_day_slots[teacher_day]
         
         # Remove room assignment
         room_key = (
@@ -227,6 +241,16 @@ class TimetableState:
             if self.subject_counts[subject_key] <= 0:
                 del self.subject_counts[subject_key]
     
+    @staticmethod
+    def _subject_day_key(assignment):
+        """Key of subject_day_counts an assignment is counted under"""
+        return (
+            assignment.get('subject'),
+            assignment.get('year'),
+            assignment.get('division'),
+            assignment.get('day')
+        )
+    
     def is_slot_locked(self, slot_key):
         """Check if a slot is locked"""
         slot_id = f"{slot_key[0]}_{slot_key[1]}_{slot_key[2]}_{slot_key[3]}"
@@ -289,6 +313,10 @@ class TimetableState:
         subject_key = (subject, year, division)
         return self.subject_counts.get(subject_key, 0)
     
+    def has_subject_on_day(self, subject, year, division, day):
+        """Check if a subject is already scheduled for a division on a given day"""
+        return (subject, year, division, day) in self.subject_day_counts
+    
     def get_remaining_lectures(self, subject, year, division):
         """Get remaining lectures needed for a subject"""
         # Find required count from smart input
@@ -12,6 +12,7 @@ class TheoryScheduler:
         self.state = state_manager
         self.context = context
         self.max_daily_lectures = 7  # Configurable?
+        self._room_pool = None  # Flattened classrooms, built on first fallback search
         
     def schedule_theory(self, class_info) -> bool:
         """
@@ -148,6 +149,27 @@ class TheoryScheduler:
                     
         return False
 
+    def _get_room_pool(self):
+        """Flatten every configured classroom into one list (computed once per scheduler)"""
+        if self._room_pool is not None:
+            return self._room_pool
+        
+        all_classrooms = self.context.get('branchData', {}).get('classrooms', {})
+        all_rooms_list = []
+        if isinstance(all_classrooms, dict):
+            for y_rooms in all_classrooms.values():
+                if isinstance(y_rooms, list):
+                    for r in y_rooms:
+                        if isinstance(r, dict): all_rooms_list.append(r.get('name'))
+                        elif isinstance(r, str): all_rooms_list.append(r)
+        elif isinstance(all_classrooms, list):
+             for r in all_classrooms:
+                 if isinstance(r, dict): all_rooms_list.append(r.get('name'))
+                 elif isinstance(r, str): all_rooms_list.append(r)
+        
+        self._room_pool = all_rooms_list
+        return all_rooms_list
+
     def _find_available_room(self, year, division, day, slot_index):
         """
         Find an available room with fallback strategy:
@@ -179,18 +201,7 @@ class TheoryScheduler:
             return home_room
             
         # 3. Fallback: Search ALL rooms
-        # Flatten all rooms
-        all_rooms_list = []
-        if isinstance(all_classrooms, dict):
-            for y_rooms in all_classrooms.values():
-                if isinstance(y_rooms, list):
-                    for r in y_rooms:
-                        if isinstance(r, dict): all_rooms_list.append(r.get('name'))
-                        elif isinstance(r, str): all_rooms_list.append(r)
-        elif isinstance(all_classrooms, list):
-             for r in all_classrooms:
-                 if isinstance(r, dict): all_rooms_list.append(r.get('name'))
-                 elif isinstance(r, str): all_rooms_list.append(r)
+        all_rooms_list = self._get_room_pool()
              
         if not all_rooms_list:
              pass 
@@ -94,10 +94,13 @@ class VersionStore:
             'metadata': metadata
         }
         
-        # Save to file
+        # Save to file: serialize in memory, then a single write + atomic rename
         version_path = self._get_version_path(branch_id, version_id)
-        with open(version_path, 'w') as f:
-            json.dump(version, f, indent=2)
+        payload = json.dumps(version, indent=2)
+        tmp_path = f"{version_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, version_path)
         
         return version
     
@@ -0,0 +1,11 @@
+"""
+Stores Module
+
+SQLite-backed persistence for branch configurations and smart input history,
+kept in the `branches` and `smart_inputs` tables of the app's database.
+"""
+
+from .branch_store import BranchStore, count_divisions
+from .smart_input_store import SmartInputStore
+
+__all__ = ['BranchStore', 'SmartInputStore', 'count_divisions']
@@ -0,0 +1,108 @@
+"""
+Branch Store Module
+
+Stores branch configurations in the `branches` table of the app's SQLite
+database. Each row keeps the full branch document as JSON alongside the
+columns used for lookups.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+import orjson
+
+from .db import SQLiteStore
+
+
+def count_divisions(divisions: Dict[str, List]) -> int:
+    """Total number of divisions across all academic years"""
+    return sum(len(divs) for divs in divisions.values())
+
+
+def _simplify_branch(branch: Dict) -> Dict:
+    """Summary of a branch as returned by GET /api/branch/all"""
+    total_divisions = branch.get('totalDivisions')
+    if total_divisions is None:
+        # Branches saved before totalDivisions was stored
+        total_divisions = count_divisions(branch['divisions'])
+    return {
+        'id': branch['id'],
+        'branchName': branch['branchName'],
+        'academicYears': branch['academicYears'],
+        'totalDivisions': total_divisions,
+        'createdAt': branch['createdAt']
+    }
+
+
+class BranchStore(SQLiteStore):
+    """Manages branch configuration storage and lookup"""
+    
+    table = 'branches'
+    
+    def __init__(self, db_path: str, legacy_file: Optional[str] = None):
+        """
+        Initialize branch store.
+        
+        Args:
+            db_path: Path of the SQLite database file
+            legacy_file: Old branches.json to import when the table is empty
+        """
+        super().__init__(db_path)
+        if legacy_file:
+            self._migrate_legacy_file(legacy_file)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        # Branch names are not unique (duplicates are allowed), only indexed
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS branches ("
+            "id TEXT PRIMARY KEY, name_lower TEXT NOT NULL, created_at TEXT, doc BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_branches_name_lower ON branches (name_lower)")
+    
+    def _migrate_legacy_file(self, legacy_file: str):
+        """Import branches from the old JSON file if the table is still empty"""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM branches LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_file, 'rb') as f:
+                branches = orjson.loads(f.read()).get('branches', [])
+        except (OSError, ValueError):
+            return
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO branches (id, name_lower, created_at, doc) VALUES (?, ?, ?, ?)",
+                [self._row(b) for b in branches]
+            )
+    
+    @staticmethod
+    def _row(branch: Dict):
+        # The legacy JSON store accepted any branchName, so don't assume a string
+        return (branch['id'], str(branch['branchName']).lower(), branch.get('createdAt'), orjson.dumps(branch))
+    
+    def add(self, branch: Dict):
+        """Insert a branch"""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO branches (id, name_lower, created_at, doc) VALUES (?, ?, ?, ?)",
+                self._row(branch)
+            )
+    
+    def find(self, branch_id: str) -> Optional[Dict]:
+        """Find a branch by ID, or None"""
+        row = self._conn().execute("SELECT doc FROM branches WHERE id = ?", (branch_id,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def name_exists(self, branch_name: str) -> bool:
+        """Check (case-insensitively) whether a branch name is already taken"""
+        row = self._conn().execute(
+            "SELECT 1 FROM branches WHERE name_lower = ? LIMIT 1", (branch_name.lower(),)
+        ).fetchone()
+        return row is not None
+    
+    def list_simplified(self) -> List[Dict]:
+        """Summaries of all branches in creation order (rebuilt only when the table changes)"""
+        return self._cached('simplified', lambda: [
+            _simplify_branch(orjson.loads(doc))
+            for doc, in self._conn().execute("SELECT doc FROM branches ORDER BY rowid")
+        ])
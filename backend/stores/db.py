@@ -0,0 +1,86 @@
+"""
+SQLite Database Module
+
+Shared SQLite plumbing for the stores: per-thread connections in WAL mode and
+per-table version counters that change on every write, so callers can cache
+derived data (and build ETags) until the table is modified.
+"""
+
+import secrets
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class SQLiteStore:
+    """Base class for stores backed by a table in a SQLite database"""
+    
+    # Name of the table whose writes bump this store's version
+    table = ''
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the store.
+        
+        Args:
+            db_path: Path of the SQLite database file (created if missing)
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._cache: Dict[str, Tuple[int, Any]] = {}
+        
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_versions ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._create_schema(conn)
+            # Start from a random value so a recreated database never reuses
+            # versions (and ETags) handed out by a previous one
+            conn.execute(
+                "INSERT OR IGNORE INTO store_versions (name, version) VALUES (?, ?)",
+                (self.table, secrets.randbits(32))
+            )
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {self.table}_version_{event.lower()} "
+                    f"AFTER {event} ON {self.table} BEGIN "
+                    f"UPDATE store_versions SET version = version + 1 WHERE name = '{self.table}'; "
+                    f"END"
+                )
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Create the store's tables and indexes"""
+        raise NotImplementedError
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def version(self) -> int:
+        """Counter incremented on every write to the store's table"""
+        row = self._conn().execute(
+            "SELECT version FROM store_versions WHERE name = ?", (self.table,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def etag(self) -> str:
+        """Validator for responses derived from this store's data"""
+        return f"{self.table}-{self.version()}"
+    
+    def _cached(self, key: str, build: Callable[[], Any]) -> Any:
+        """Return `build()`, reusing the previous result until the table changes"""
+        version = self.version()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = build()
+        self._cache[key] = (version, value)
+        return value
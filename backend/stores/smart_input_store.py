@@ -0,0 +1,130 @@
+"""
+Smart Input Store Module
+
+Keeps the most recent smart input submissions in the `smart_inputs` table of
+the app's SQLite database. History metadata and the full payload (teachers,
+subjects, maps) are separate columns, so listing the history never touches
+the payloads. A trigger caps the table at `limit` rows.
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from .db import SQLiteStore
+
+
+class SmartInputStore(SQLiteStore):
+    """Manages smart input history and payload storage"""
+    
+    table = 'smart_inputs'
+    
+    def __init__(self, db_path: str, legacy_dir: Optional[str] = None,
+                 legacy_file: Optional[str] = None, limit: int = 20):
+        """
+        Initialize smart input store.
+        
+        Args:
+            db_path: Path of the SQLite database file
+            legacy_dir: Old smart_inputs/ directory (index.json + {id}.json payloads)
+            legacy_file: Old single-file history, used if legacy_dir has no index
+            limit: Number of history entries to keep
+        """
+        self.limit = limit
+        super().__init__(db_path)
+        self._migrate_legacy_history(legacy_dir, legacy_file)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS smart_inputs ("
+            "id TEXT PRIMARY KEY, created_at TEXT, meta BLOB NOT NULL, data BLOB NOT NULL)"
+        )
+        # Recreated on startup so a changed limit takes effect
+        conn.execute("DROP TRIGGER IF EXISTS smart_inputs_cap")
+        conn.execute(
+            "CREATE TRIGGER smart_inputs_cap AFTER INSERT ON smart_inputs BEGIN "
+            "DELETE FROM smart_inputs WHERE rowid NOT IN "
+            f"(SELECT rowid FROM smart_inputs ORDER BY rowid DESC LIMIT {int(self.limit)}); "
+            "END"
+        )
+    
+    def _migrate_legacy_history(self, legacy_dir: Optional[str], legacy_file: Optional[str]):
+        """Import the old file-based history if the table is still empty"""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM smart_inputs LIMIT 1").fetchone():
+            return
+        
+        rows = []
+        index_path = os.path.join(legacy_dir, 'index.json') if legacy_dir else None
+        try:
+            if index_path and os.path.exists(index_path):
+                with open(index_path, 'rb') as f:
+                    for entry in orjson.loads(f.read()).get('history', []):
+                        with open(os.path.join(legacy_dir, f"{entry['id']}.json"), 'rb') as p:
+                            rows.append((entry, p.read()))
+            elif legacy_file:
+                with open(legacy_file, 'rb') as f:
+                    for entry in orjson.loads(f.read()).get('history', []):
+                        entry = dict(entry)
+                        rows.append((entry, orjson.dumps(entry.pop('data', {}))))
+        except (OSError, ValueError, KeyError):
+            return
+        
+        with conn:
+            for entry, payload in rows[-self.limit:]:
+                conn.execute(
+                    "INSERT OR IGNORE INTO smart_inputs (id, created_at, meta, data) VALUES (?, ?, ?, ?)",
+                    (entry['id'], entry.get('createdAt'), orjson.dumps(entry), payload)
+                )
+    
+    def history(self) -> List[Dict]:
+        """History metadata, oldest first (rebuilt only when the table changes)"""
+        return self._cached('history', lambda: [
+            orjson.loads(meta)
+            for meta, in self._conn().execute("SELECT meta FROM smart_inputs ORDER BY rowid")
+        ])
+    
+    def add(self, entry: Dict, payload: bytes):
+        """
+        Record a new history entry; the oldest entries beyond `limit` are dropped.
+        
+        Args:
+            entry: Metadata for the history list (must contain 'id')
+            payload: Serialized JSON payload stored alongside it
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO smart_inputs (id, created_at, meta, data) VALUES (?, ?, ?, ?)",
+                (entry['id'], entry.get('createdAt'), orjson.dumps(entry), payload)
+            )
+    
+    def find(self, entry_id: str) -> Optional[Dict]:
+        """Find a history entry's metadata by ID, or None"""
+        row = self._conn().execute("SELECT meta FROM smart_inputs WHERE id = ?", (entry_id,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def load_data(self, entry_id: str) -> Optional[Any]:
+        """Load the full payload of a history entry, or None"""
+        row = self._conn().execute("SELECT data FROM smart_inputs WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return orjson.loads(row[0])
+        except ValueError:
+            return None
+    
+    def load_entry(self, entry_id: str) -> Optional[Dict]:
+        """
+        Load a history entry's metadata together with its payload under 'data',
+        or None. Both come from one row read, so a concurrent eviction can
+        never leave one without the other.
+        """
+        row = self._conn().execute("SELECT meta, data FROM smart_inputs WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return {**orjson.loads(row[0]), 'data': orjson.loads(row[1])}
+        except ValueError:
+            return None
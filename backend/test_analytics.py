@@ -12,7 +12,7 @@ from analytics.workload_analysis import compute_teacher_workload, generate_workl
 from analytics.lab_usage import compute_lab_heatmap, analyze_lab_efficiency
 from analytics.free_slots import find_free_slots, analyze_free_capacity
 from analytics.bottleneck_detector import detect_bottlenecks
-from analytics.analytics_engine import generate_full_analytics, compute_quality_score
+from analytics.analytics_engine import generate_full_analytics, compute_quality_score, extract_top_insights
 
 
 # Sample test data
@@ -193,6 +193,53 @@ def test_full_analytics():
     print("✅ Full analytics test passed")
 
 
+
+def test_shared_slot_index():
+    """Test full analytics (one shared slot index) matches the standalone computations"""
+    print("\n=== Testing Shared Slot Index ===")
+    
+    analytics = generate_full_analytics(SAMPLE_TIMETABLE, SAMPLE_CONTEXT)
+    
+    assert analytics['workload']['metrics'] == compute_teacher_workload(SAMPLE_TIMETABLE, SAMPLE_CONTEXT)
+    assert analytics['labUsage']['metrics'] == compute_lab_heatmap(SAMPLE_TIMETABLE, SAMPLE_CONTEXT)
+    assert analytics['freeSlots']['metrics'] == find_free_slots(SAMPLE_TIMETABLE, SAMPLE_CONTEXT)
+    
+    print("✅ Shared slot index test passed")
+
+
+def test_full_analytics_memoized():
+    """Test identical inputs reuse the cached report and changed inputs do not"""
+    print("\n=== Testing Full Analytics Memoization ===")
+    
+    first = generate_full_analytics(SAMPLE_TIMETABLE, SAMPLE_CONTEXT)
+    again = generate_full_analytics([dict(slot) for slot in SAMPLE_TIMETABLE], dict(SAMPLE_CONTEXT))
+    assert again is first
+    
+    changed = generate_full_analytics(SAMPLE_TIMETABLE[:-1], SAMPLE_CONTEXT)
+    assert changed is not first
+    assert changed['freeSlots']['metrics']['totalOccupiedSlots'] == first['freeSlots']['metrics']['totalOccupiedSlots'] - 1
+    
+    print("✅ Full analytics memoization test passed")
+
+
+def test_top_insights_prefixes():
+    """Test only positive-prefixed insights are picked as strengths"""
+    print("\n=== Testing Top Insight Prefixes ===")
+    
+    issues, strengths = extract_top_insights({
+        'workload_insights': ["⚠️ Teacher A has 8 lectures on Monday (heavy overload)", "✅ Teacher workload is well-balanced across all faculty"],
+        'lab_insights': ["🔴 Lab-1 is unbalanced (95% - bottleneck risk)"],
+        'free_insights': [],
+        'bottlenecks': [],
+        'quality_score': {'score': 50}
+    })
+    
+    assert issues == ["⚠️ Teacher A has 8 lectures on Monday (heavy overload)", "🔴 Lab-1 is unbalanced (95% - bottleneck risk)"]
+    assert strengths == ["✅ Teacher workload is well-balanced across all faculty"]
+    
+    print("✅ Top insight prefix test passed")
+
+
 if __name__ == '__main__':
     print("Running Analytics Module Tests...")
     print("=" * 60)
@@ -204,6 +251,9 @@ if __name__ == '__main__':
         test_bottleneck_detection()
         test_quality_score()
         test_full_analytics()
+        test_shared_slot_index()
+        test_full_analytics_memoized()
+        test_top_insights_prefixes()
         
         print("\n" + "=" * 60)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,73 @@
+"""
+Tests for the Flask routes' input handling and static file serving
+
+Run with: python -m pytest backend/test_app_routes.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add repository root (app.py) to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+
+@pytest.fixture
+def app_module(monkeypatch, tmp_path):
+    """The Flask app module, run from a temp directory"""
+    # app.py keeps its data directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+VALID_BRANCH = {
+    'branchName': 'Computer Engineering',
+    'academicYears': ['SE'],
+    'divisions': {'SE': ['A', 'B']},
+    'workingDays': ['Monday']
+}
+
+
+@pytest.mark.parametrize('divisions', [['A', 'B'], {'SE': 3}, 'A'])
+def test_branch_setup_rejects_malformed_divisions(client, divisions):
+    """Test divisions that are not a dict of lists get a 400 instead of failing in totalDivisions"""
+    response = client.post('/api/branch/setup', json={**VALID_BRANCH, 'divisions': divisions})
+    assert response.status_code == 400
+    assert 'divisions' in response.get_json()['error']
+
+
+def test_branch_setup_counts_divisions(client):
+    """Test a valid branch is stored with its division total"""
+    response = client.post('/api/branch/setup', json=VALID_BRANCH)
+    assert response.status_code == 201
+    assert response.get_json()['branch']['totalDivisions'] == 2
+
+
+def test_static_files_added_after_startup_are_served(app_module, monkeypatch, tmp_path):
+    """Test a frontend rebuild's new assets are served instead of the index.html fallback"""
+    build = tmp_path / 'dist'
+    (build / 'assets').mkdir(parents=True)
+    (build / 'index.html').write_text('<html></html>')
+    monkeypatch.setattr(app_module.app, 'static_folder', str(build))
+    monkeypatch.setattr(app_module, '_STATIC_FILES', app_module._collect_static_files(str(build)))
+    
+    (build / 'assets' / 'index-abc123.js').write_text('console.log(1)')
+    
+    def serve(path):
+        with app_module.app.test_request_context('/' + path):
+            response = app_module.serve(path)
+            response.direct_passthrough = False
+            return response.get_data()
+    
+    assert serve('assets/index-abc123.js') == b'console.log(1)'
+    assert serve('dashboard') == b'<html></html>'
+    assert serve('../secret') == b'<html></html>'
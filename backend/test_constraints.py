@@ -153,5 +153,84 @@ def test_constraint_engine():
     print("=" * 60)
 
 
+def test_result_memoization():
+    """Test repeated validations reuse results until the inputs or enabled constraints change"""
+    
+    engine = ConstraintEngine()
+    
+    first = engine.validate_timetable(sample_timetable, sample_context)
+    assert engine.validate_timetable([dict(s) for s in sample_timetable], sample_context) is first
+    assert not first['valid']
+    
+    engine.disable_constraint("TEACHER_NON_OVERLAP")
+    without_overlap = engine.validate_timetable(sample_timetable, sample_context)
+    assert without_overlap is not first
+    assert all(v['constraint'] != "TEACHER_NON_OVERLAP" for v in without_overlap['hardViolations'])
+    
+    engine.enable_constraint("TEACHER_NON_OVERLAP")
+    assert engine.validate_timetable(sample_timetable, sample_context) is first
+
+    # Scoring a validated timetable reuses its soft check results
+    soft_checks = []
+    for constraint in engine.soft_constraints:
+        constraint.check = lambda timetable, context, check=constraint.check: soft_checks.append(1) or check(timetable, context)
+    score = engine.compute_quality_score(sample_timetable, sample_context)
+    assert soft_checks == [] and round(score, 2) == first['qualityScore']
+    print("Memoization test passed")
+
+
+def test_validate_slot_matches_full_check():
+    """Test validate_slot's incremental checks report what a full check of the combined timetable does"""
+    
+    engine = ConstraintEngine()
+    candidates = [
+        dict(sample_timetable[0], id="clash", year="TE", division="A", room="Lab-3"),
+        dict(sample_timetable[2], id="room_clash", teacher="Neha", room="Lab-1"),
+        dict(sample_timetable[0], id="new_time", day="Friday", room="Room-9")
+    ]
+    
+    for new_slot in candidates:
+        expected = []
+        for constraint in engine.incremental_constraints:
+            for violation in constraint.check(sample_timetable + [new_slot], sample_context)['violations']:
+                violation['constraint'] = constraint.name
+                expected.append(violation)
+        
+        result = engine.validate_slot(new_slot, sample_timetable, sample_context)
+        assert result['violations'] == expected
+        assert result['conflicts'] == [v for v in expected if engine._involves_new_slot(v, new_slot)]
+    print("Incremental slot validation test passed")
+
+
+def test_fast_mode_stops_at_first_hard_failure():
+    """Test 'fast' validation agrees on validity and skips the rest once a hard constraint fails"""
+    
+    engine = ConstraintEngine()
+    full = engine.validate_timetable(sample_timetable, sample_context)
+    fast = engine.validate_timetable(sample_timetable, sample_context, mode='fast')
+    
+    assert fast['valid'] == full['valid'] == False
+    assert fast['hardViolations'] == [v for v in full['hardViolations'] if v['constraint'] == "TEACHER_NON_OVERLAP"]
+    assert fast['softViolations'] == [] and fast['qualityScore'] is None
+    
+    valid_timetable = sample_timetable[2:3]
+    engine.disable_constraint("WEEKLY_LECTURE_COMPLETION")
+    assert engine.validate_timetable(valid_timetable, sample_context, mode='fast') == \
+        engine.validate_timetable(valid_timetable, sample_context)
+
+    # The failing constraint itself stops at its first violating slot
+    unknown_teachers = [{**slot, "teacher": "Unknown"} for slot in sample_timetable]
+    engine.disable_constraint("TEACHER_NON_OVERLAP")
+    engine.disable_constraint("ROOM_NON_OVERLAP")
+    full = engine.validate_timetable(unknown_teachers, sample_context)
+    fast = engine.validate_timetable(unknown_teachers, sample_context, mode='fast')
+    assert len(full['hardViolations']) == len(unknown_teachers)
+    assert fast['hardViolations'] == full['hardViolations'][:1]
+    print("Fast mode test passed")
+
+
 if __name__ == "__main__":
     test_constraint_engine()
+    test_result_memoization()
+    test_validate_slot_matches_full_check()
+    test_fast_mode_stops_at_first_hard_failure()
@@ -0,0 +1,70 @@
+"""
+Tests for the PDF upload endpoint's worker process handling
+
+Run with: python -m pytest backend/test_pdf_upload.py -v
+"""
+
+import io
+import os
+import sys
+import time
+import multiprocessing
+
+import pytest
+
+# Add repository root (app.py, pdf_parser.py) to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+
+def _stuck_parse(pdf_stream):
+    """Stand-in for a PDF whose parse never finishes"""
+    time.sleep(600)
+
+
+def _quick_parse(pdf_stream):
+    """Stand-in for a PDF that parses straight away"""
+    return {'success': True, 'type': 'table', 'pages': 1, 'extraction_method': 'text',
+            'row_count': 0, 'rows': []}
+
+
+@pytest.fixture
+def app_module(monkeypatch, tmp_path):
+    """The Flask app module with a short parse timeout and a single worker"""
+    # app.py keeps its data directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    import app
+    monkeypatch.setattr(app, 'PDF_PARSE_TIMEOUT', 2)
+    monkeypatch.setattr(app, 'PDF_PARSE_WORKERS', 1)
+    monkeypatch.setattr(app, 'PDF_UPLOAD_AUDIT', False)
+    yield app
+    if app._pdf_pool is not None:
+        app._discard_pdf_pool(app._pdf_pool)
+
+
+def _upload(client):
+    return client.post('/api/upload/timetable/pdf',
+                       data={'file': (io.BytesIO(b'%PDF-1.4'), 'timetable.pdf')},
+                       content_type='multipart/form-data')
+
+
+def test_pdf_parse_timeout_kills_worker(app_module, monkeypatch):
+    """A timed out parse is killed, and the next upload gets a fresh worker instead of queueing"""
+    import pdf_parser
+    client = app_module.app.test_client()
+    
+    monkeypatch.setattr(pdf_parser, 'parse_pdf_stream', _stuck_parse)
+    response = _upload(client)
+    assert response.status_code == 504
+    assert app_module._pdf_pool is None
+    
+    deadline = time.time() + 10
+    while multiprocessing.active_children() and time.time() < deadline:
+        time.sleep(0.1)
+    assert not multiprocessing.active_children()
+    
+    monkeypatch.setattr(pdf_parser, 'parse_pdf_stream', _quick_parse)
+    response = _upload(client)
+    assert response.status_code == 200
+    assert response.get_json()['success']
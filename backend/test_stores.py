@@ -0,0 +1,148 @@
+"""
+Tests for the branch and smart input stores
+
+Run with: python -m pytest backend/test_stores.py -v
+"""
+
+import pytest
+import os
+import sys
+
+import orjson
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from stores import BranchStore, SmartInputStore
+
+
+SAMPLE_BRANCH = {
+    'id': 'b1',
+    'createdAt': '2025-01-01T10:00:00',
+    'branchName': 'Computer Engineering',
+    'academicYears': ['SE', 'TE'],
+    'divisions': {'SE': ['A', 'B'], 'TE': ['A']},
+    'workingDays': ['Monday', 'Tuesday']
+}
+
+
+@pytest.fixture
+def branch_store(tmp_path):
+    """Create a branch store in a temp database"""
+    return BranchStore(str(tmp_path / 'test.db'))
+
+
+@pytest.fixture
+def smart_input_store(tmp_path):
+    """Create a smart input store with a small history limit"""
+    return SmartInputStore(str(tmp_path / 'test.db'), limit=3)
+
+
+def test_branch_add_and_find(branch_store):
+    """Test branches are persisted and looked up by id and name"""
+    branch_store.add(dict(SAMPLE_BRANCH))
+    
+    assert branch_store.find('b1')['branchName'] == 'Computer Engineering'
+    assert branch_store.find('missing') is None
+    assert branch_store.name_exists('computer engineering')
+    assert not branch_store.name_exists('Mechanical')
+
+
+def test_branch_list_simplified(branch_store):
+    """Test the list projection counts divisions for records without totalDivisions"""
+    branch_store.add(dict(SAMPLE_BRANCH))
+    
+    simplified = branch_store.list_simplified()
+    assert simplified == [{
+        'id': 'b1',
+        'branchName': 'Computer Engineering',
+        'academicYears': ['SE', 'TE'],
+        'totalDivisions': 3,
+        'createdAt': '2025-01-01T10:00:00'
+    }]
+
+
+def test_branch_list_sees_writes_from_other_connections(branch_store):
+    """Test the cached list is rebuilt when another store instance writes"""
+    branch_store.add(dict(SAMPLE_BRANCH))
+    assert len(branch_store.list_simplified()) == 1
+    version = branch_store.version()
+    
+    other_store = BranchStore(branch_store.db_path)
+    other_store.add({**SAMPLE_BRANCH, 'id': 'b2', 'branchName': 'IT'})
+    
+    assert branch_store.version() > version
+    assert [b['id'] for b in branch_store.list_simplified()] == ['b1', 'b2']
+
+
+def test_branch_migrates_legacy_file(tmp_path):
+    """Test branches.json is imported into an empty database"""
+    legacy_file = tmp_path / 'branches.json'
+    legacy_file.write_bytes(orjson.dumps({'branches': [SAMPLE_BRANCH]}))
+    
+    store = BranchStore(str(tmp_path / 'test.db'), legacy_file=str(legacy_file))
+    
+    assert store.find('b1') == SAMPLE_BRANCH
+
+
+def test_branch_migrates_non_string_names(tmp_path):
+    """Test legacy branches with a non-string branchName are still imported"""
+    legacy_file = tmp_path / 'branches.json'
+    legacy_file.write_bytes(orjson.dumps({'branches': [{**SAMPLE_BRANCH, 'branchName': 42}]}))
+    
+    store = BranchStore(str(tmp_path / 'test.db'), legacy_file=str(legacy_file))
+    
+    assert store.find('b1')['branchName'] == 42
+    assert store.name_exists('42')
+
+
+def test_smart_input_history_is_capped(smart_input_store):
+    """Test the cap trigger deletes the oldest rows, payloads included, past the limit"""
+    for i in range(5):
+        smart_input_store.add({'id': f'e{i}'}, orjson.dumps({'teachers': [i]}))
+    
+    assert [e['id'] for e in smart_input_store.history()] == ['e2', 'e3', 'e4']
+    assert smart_input_store.load_data('e0') is None
+    assert smart_input_store.load_data('e4') == {'teachers': [4]}
+
+
+def test_smart_input_unknown_ids(smart_input_store):
+    """Test lookups of ids not in the history return None"""
+    assert smart_input_store.find('missing') is None
+    assert smart_input_store.load_data('missing') is None
+    assert smart_input_store.load_entry('missing') is None
+
+
+def test_smart_input_load_entry(smart_input_store):
+    """Test an entry's metadata and payload are loaded together"""
+    smart_input_store.add({'id': 'e1', 'branchName': 'IT'}, orjson.dumps({'teachers': []}))
+    
+    assert smart_input_store.load_entry('e1') == {'id': 'e1', 'branchName': 'IT', 'data': {'teachers': []}}
+
+
+def test_smart_input_migrates_legacy_history(tmp_path):
+    """Test the legacy single-file history is imported"""
+    legacy_file = tmp_path / 'smart_input_history.json'
+    legacy_file.write_bytes(orjson.dumps({'history': [
+        {'id': 'old', 'branchName': 'IT', 'data': {'subjects': ['DBMS']}}
+    ]}))
+    
+    store = SmartInputStore(str(tmp_path / 'test.db'), legacy_file=str(legacy_file))
+    
+    assert store.history() == [{'id': 'old', 'branchName': 'IT'}]
+    assert store.load_data('old') == {'subjects': ['DBMS']}
+
+
+def test_smart_input_migrates_index_directory(tmp_path):
+    """Test the index.json + per-entry payload layout is imported"""
+    legacy_dir = tmp_path / 'smart_inputs'
+    legacy_dir.mkdir()
+    (legacy_dir / 'index.json').write_bytes(orjson.dumps({'history': [{'id': 'e1', 'branchName': 'IT'}]}))
+    (legacy_dir / 'e1.json').write_bytes(b'{"teachers": []}')
+    
+    store = SmartInputStore(str(tmp_path / 'test.db'), legacy_dir=str(legacy_dir))
+    
+    assert store.find('e1') == {'id': 'e1', 'branchName': 'IT'}
+    assert store.load_data('e1') == {'teachers': []}
@@ -135,7 +135,7 @@ class ImprovementEngine:
                 modified[i]['slot'] = slot1['slot']
         
         # CRITICAL: Validate modified timetable
-        validation = self.constraint_engine.validate_timetable(modified, self.context)
+        validation = self.constraint_engine.validate_timetable(modified, self.context, mode='fast')
         
         if not validation['valid']:
             return None  # Reject swap that breaks constraints
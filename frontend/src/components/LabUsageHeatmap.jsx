@@ -82,7 +82,7 @@ function LabUsageHeatmap({ labUsage }) {
                                 <td className="time-label">{time}</td>
                                 {days.map(day => {
                                     const value = labData.heatmap[day][time]
-                                    const isOccupied = value === 1.0
+                                    const isOccupied = value === 1
                                     return (
                                         <td key={day}>
                                             <div
@@ -80,8 +80,27 @@ function ReuseDataSelector({ onDataSelected }) {
         }
     }
 
-    const handleSelectSetup = (setup) => {
-        setSelectedSetup(setup)
+    const handleSelectSetup = async (setup) => {
+        let fullSetup = setup
+
+        // History only lists metadata; fetch the full teachers/subjects payload on demand
+        if (!setup.data) {
+            try {
+                const response = await fetch(`http://localhost:5000/api/smart-input/${setup.id}`)
+
+                if (!response.ok) {
+                    console.error('Failed to fetch setup data')
+                    return
+                }
+                const result = await response.json()
+                fullSetup = result.entry
+            } catch (error) {
+                console.error('Error fetching setup data:', error)
+                return
+            }
+        }
+
+        setSelectedSetup(fullSetup)
         setShowWarning(true)
     }
 
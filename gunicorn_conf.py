@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration
+
+Run with: gunicorn -c gunicorn_conf.py wsgi
+Each worker keeps its own in-memory caches; they are keyed by the per-table
+version counters in the SQLite database (bumped by triggers on every write),
+so writes made by one worker are picked up by the others.
+"""
+import os
+from multiprocessing import cpu_count
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2 * cpu_count() + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+# PDF parsing and timetable generation can take a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
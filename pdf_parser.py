@@ -10,13 +10,14 @@ from PIL import Image
 import io
 
 
-def detect_pdf_type(pdf_path):
+def detect_pdf_type(pdf_source):
     """
     Detect if PDF is text-based or scanned
+    pdf_source may be a file path or a binary file-like object
     Returns: 'text-based' or 'scanned'
     """
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfplumber.open(pdf_source) as pdf:
             # Check first page for text content
             if len(pdf.pages) > 0:
                 first_page = pdf.pages[0]
@@ -32,7 +33,7 @@ def detect_pdf_type(pdf_path):
         return 'unknown'
 
 
-def extract_from_text_pdf(pdf_path):
+def extract_from_text_pdf(pdf_source):
     """
     Extract table data from text-based PDF using pdfplumber
     Returns: List of dictionaries representing rows
@@ -40,7 +41,7 @@ def extract_from_text_pdf(pdf_path):
     all_rows = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfplumber.open(pdf_source) as pdf:
             for page_num, page in enumerate(pdf.pages):
                 # Extract tables from the page
                 tables = page.extract_tables()
@@ -89,7 +90,7 @@ def extract_from_text_pdf(pdf_path):
         raise Exception(f"Failed to extract from text PDF: {str(e)}")
 
 
-def extract_from_scanned_pdf(pdf_path):
+def extract_from_scanned_pdf(pdf_source):
     """
     Extract table data from scanned PDF using OCR (pytesseract)
     Returns: List of dictionaries representing rows
@@ -108,7 +109,7 @@ def extract_from_scanned_pdf(pdf_path):
         
         all_rows = []
         
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfplumber.open(pdf_source) as pdf:
             for page_num, page in enumerate(pdf.pages):
                 # Convert page to image
                 page_image = page.to_image(resolution=300)
@@ -147,23 +148,43 @@ def parse_pdf_file(pdf_path):
     
     Returns: Dictionary with extraction results
     """
+    if not os.path.exists(pdf_path):
+        return _failed_result("PDF file not found")
+    
+    return _parse_pdf(pdf_path)
+
+
+def parse_pdf_stream(pdf_stream):
+    """
+    Parse a PDF held in memory (e.g. an uploaded file) without touching disk
+    
+    Args:
+        pdf_stream: bytes or a binary file-like object (BytesIO, upload stream)
+    
+    Returns: Dictionary with extraction results (same shape as parse_pdf_file)
+    """
+    if isinstance(pdf_stream, (bytes, bytearray)):
+        pdf_stream = io.BytesIO(pdf_stream)
+    
+    return _parse_pdf(pdf_stream)
+
+
+def _parse_pdf(pdf_source):
+    """Detect PDF type and extract rows from a path or binary file-like object"""
     try:
-        if not os.path.exists(pdf_path):
-            raise Exception("PDF file not found")
-        
         # Detect PDF type
-        pdf_type = detect_pdf_type(pdf_path)
+        pdf_type = detect_pdf_type(pdf_source)
         
         # Get number of pages
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfplumber.open(pdf_source) as pdf:
             num_pages = len(pdf.pages)
         
         # Extract based on type
         if pdf_type == 'text-based':
-            rows = extract_from_text_pdf(pdf_path)
+            rows = extract_from_text_pdf(pdf_source)
             extraction_method = 'table_extraction'
         elif pdf_type == 'scanned':
-            rows = extract_from_scanned_pdf(pdf_path)
+            rows = extract_from_scanned_pdf(pdf_source)
             extraction_method = 'ocr'
         else:
             raise Exception("Could not determine PDF type. Please ensure the file is a valid PDF.")
@@ -178,13 +199,18 @@ def parse_pdf_file(pdf_path):
         }
     
     except Exception as e:
-        return {
-            'success': False,
-            'error': str(e),
-            'type': None,
-            'pages': 0,
-            'rows': []
-        }
+        return _failed_result(str(e))
+
+
+def _failed_result(error):
+    """Build the result dictionary for a failed parse"""
+    return {
+        'success': False,
+        'error': error,
+        'type': None,
+        'pages': 0,
+        'rows': []
+    }
 
 
 # Test function (for development only)